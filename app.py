@@ -1,12 +1,14 @@
 import os
-import json, tempfile, shutil
-from concurrent.futures import ThreadPoolExecutor
-from flask import Flask, render_template, request, jsonify # type: ignore
+import json, tempfile, shutil, stat
+import queue, threading, time, itertools
+from flask import Flask, Response, render_template, request, jsonify # type: ignore
+from flask.json.provider import DefaultJSONProvider # type: ignore
+import orjson # type: ignore
 from dotenv import load_dotenv # type: ignore
 import platform
 
-from media_utils import scan_repo, move_files, ffmpeg_proxy, ffmpeg_extract_audio, move_with_robocopy
-from sheets_sync import open_sheet, sync_records, log_upload
+from media_utils import scan_repo, iter_scan_repo, move_files, ffmpeg_proxy, ffmpeg_extract_audio, move_with_robocopy
+from sheets_sync import open_sheet, sync_records, forget_sheets, upload_log_buffer
 
 load_dotenv()
 
@@ -17,30 +19,71 @@ ENV_SHOW_MEDIA_DIR = os.environ.get('SHOW_MEDIA_DIR', '/repo_show')
 
 CONFIG_DIR = os.environ.get('CONFIG_DIR', '/config')
 SETTINGS_PATH = os.path.join(CONFIG_DIR, 'settings.json')
-DEFAULT_SA_JSON = os.environ.get('GOOGLE_SERVICE_ACCOUNT_JSON', os.path.join(CONFIG_DIR, 'google-service-account.json'))
+SA_UPLOAD_PATH = os.path.join(CONFIG_DIR, 'google-service-account.json')
+DEFAULT_SA_JSON = os.environ.get('GOOGLE_SERVICE_ACCOUNT_JSON', SA_UPLOAD_PATH)
 DEFAULT_SHEET_NAME = os.environ.get('GOOGLE_SHEET_NAME', 'Media Repo Inventory')
 
-app = Flask(__name__)
-executor = ThreadPoolExecutor(max_workers=4)
-JOBS = {}
+# Text settings accepted from the Settings form; all of them are required
+SETTINGS_TEXT_KEYS = ('sheet_name', 'repo_dir', 'quarantine_dir', 'show_media_dir', 'service_account_json')
+SETTINGS_KEYS = SETTINGS_TEXT_KEYS + ('use_robocopy',)
+# settings.json is written compact; set SETTINGS_PRETTY=1 to keep it hand-editable
+SETTINGS_DUMP_OPTS = orjson.OPT_INDENT_2 if os.environ.get('SETTINGS_PRETTY') == '1' else 0
 
+class OrjsonProvider(DefaultJSONProvider):
+    """Serialize jsonify() responses with orjson; scan results can be thousands of records."""
 
-def load_settings():
-    os.makedirs(CONFIG_DIR, exist_ok=True)
-    if os.path.exists(SETTINGS_PATH):
-        try:
-            with open(SETTINGS_PATH, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            # Backup the bad file and continue with defaults
-            try:
-                import time, shutil
-                ts = time.strftime('%Y%m%d-%H%M%S')
-                backup = f"{SETTINGS_PATH}.bad-{ts}"
-                shutil.copy2(SETTINGS_PATH, backup)
-            except Exception:
-                pass
-            # You could also log the error here
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+app = Flask(__name__)
+app.json = OrjsonProvider(app)
+JOBS = {}
+# Condition so /api/jobs/stream can sleep until a worker changes something
+JOBS_LOCK = threading.Condition()
+
+# Background job queue: proxy/audio batches are split into one task per file so
+# JOB_WORKERS ffmpeg processes run side by side; a full queue rejects the file
+# instead of letting work pile up invisibly.
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', '4'))
+JOB_QUEUE = queue.Queue(maxsize=int(os.environ.get('JOB_QUEUE_SIZE', '256')))
+_JOB_SEQ = itertools.count(1)
+_JOB_FINISHED = {}       # job_id -> time.monotonic() when it finished
+JOB_TTL = 3600           # finished jobs are dropped from JOBS after an hour
+PROGRESS_INTERVAL = 0.1  # seconds between published per-file progress updates
+SSE_KEEPALIVE = 15      # seconds of silence before a job stream sends a comment line
+JOB_STREAM_MAX_IDS = 64  # jobs one /api/jobs/stream connection will follow
+
+# Latest repo scan as (repo_dir, records, started_at). A background thread
+# re-walks the repo every SCAN_REFRESH_SEC so /api/scan and /api/sync-sheets
+# answer from memory; 0 disables caching and walks on every request.
+SCAN_REFRESH_SEC = float(os.environ.get('SCAN_REFRESH_SEC', '60'))
+_SCAN_RESULT = None
+_SCAN_MUTEX = threading.Lock()
+# Bumped by invalidate_scan(); a walk that started before a bump doesn't store its result
+_SCAN_GEN = 0
+_SCAN_GEN_LOCK = threading.Lock()
+# Files probed at once during a scan; unset uses media_utils' default (min(32, 4 x CPUs))
+SCAN_WORKERS = int(os.environ.get('SCAN_WORKERS', '0')) or None
+
+
+# Parsed settings.json, keyed by (st_mtime_ns, st_size) so a rewrite of the
+# file is picked up on the next call without re-parsing on every request.
+_SETTINGS_CACHE = {'key': None, 'value': None}
+_CONFIG_DIR_READY = False
+
+
+def _ensure_config_dir():
+    global _CONFIG_DIR_READY
+    if not _CONFIG_DIR_READY:
+        os.makedirs(CONFIG_DIR, exist_ok=True)
+        _CONFIG_DIR_READY = True
+
+
+def _default_settings():
     return {
         'sheet_name': DEFAULT_SHEET_NAME,
         'service_account_json': DEFAULT_SA_JSON,
@@ -51,18 +94,255 @@ def load_settings():
     }
 
 
+# (mtime_ns, size) of the last settings.json we backed up, and when
+_LAST_BACKUP_KEY = None
+_LAST_BACKUP_TS = 0.0
+BACKUP_INTERVAL = 60.0
+
+
+def _backup_bad_settings():
+    """Keep a copy of an unreadable settings.json, at most once a minute per distinct file."""
+    global _LAST_BACKUP_KEY, _LAST_BACKUP_TS
+    try:
+        st = os.stat(SETTINGS_PATH)
+        key = (st.st_mtime_ns, st.st_size)
+        now = time.monotonic()
+        if _LAST_BACKUP_KEY is not None and (key == _LAST_BACKUP_KEY or now - _LAST_BACKUP_TS < BACKUP_INTERVAL):
+            return
+        _LAST_BACKUP_KEY, _LAST_BACKUP_TS = key, now
+        ts = time.strftime('%Y%m%d-%H%M%S')
+        backup = f"{SETTINGS_PATH}.bad-{ts}"
+        shutil.copy2(SETTINGS_PATH, backup)
+    except Exception:
+        pass
+
+
+def _read_settings():
+    """Parsed settings.json, or None (after backing it up) if it can't be read."""
+    try:
+        with open(SETTINGS_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        # Backup the bad file and continue with defaults
+        print(f"⚠️ Could not read {SETTINGS_PATH}, using defaults: {e}")
+        _backup_bad_settings()
+    return None
+
+
+def load_settings():
+    _ensure_config_dir()
+    try:
+        st = os.stat(SETTINGS_PATH)
+    except FileNotFoundError:
+        return _default_settings()
+    key = (st.st_mtime_ns, st.st_size)
+    if _SETTINGS_CACHE['key'] != key:
+        _SETTINGS_CACHE['value'] = _read_settings()
+        _SETTINGS_CACHE['key'] = key
+    value = _SETTINGS_CACHE['value']
+    # Callers merge into the dict they get back, so never hand out the cached one
+    return _default_settings() if value is None else dict(value)
+
+
+def _saved_settings():
+    """settings.json as last parsed successfully, or None if it's missing or unreadable."""
+    if not os.path.isfile(SETTINGS_PATH):
+        return None
+    load_settings()
+    return _SETTINGS_CACHE['value']
+
 
 def save_settings(data: dict):
-    os.makedirs(CONFIG_DIR, exist_ok=True)
-    with open(SETTINGS_PATH, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2)
+    """Atomically replace settings.json. Returns False if the contents were already identical."""
+    _ensure_config_dir()
+    # Compare with the file only if it parsed: defaults standing in for a corrupt
+    # settings.json must not keep the bad file on disk
+    if _saved_settings() == data:
+        return False
+    fd, tmp = tempfile.mkstemp(dir=CONFIG_DIR, prefix='settings.', suffix='.json')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(orjson.dumps(data, option=SETTINGS_DUMP_OPTS))
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file 0600; keep the mode other readers of settings.json rely on
+        try:
+            mode = stat.S_IMODE(os.stat(SETTINGS_PATH).st_mode)
+        except OSError:
+            mode = 0o644
+        os.chmod(tmp, mode)
+        # Same-directory rename: readers see either the old or the new file, never a partial one
+        os.replace(tmp, SETTINGS_PATH)
+    except Exception:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return True
 
 
-def cfg_paths():
-    cfg = load_settings()
+# Short-lived results of isdir/isfile checks on configured paths; these usually
+# sit on network mounts and the UI tends to fire requests in bursts.
+PATH_CHECK_TTL = 5.0
+_PATH_CHECKS = {}
+
+
+def _cached_path_check(check, path):
+    now = time.monotonic()
+    key = (check, path)
+    hit = _PATH_CHECKS.get(key)
+    if hit and now - hit[0] < PATH_CHECK_TTL:
+        return hit[1]
+    result = check(path)
+    _PATH_CHECKS[key] = (now, result)
+    return result
+
+
+def isdir_cached(path):
+    return _cached_path_check(os.path.isdir, path)
+
+
+def isfile_cached(path):
+    return _cached_path_check(os.path.isfile, path)
+
+
+def cfg_paths(cfg=None):
+    cfg = cfg or load_settings()
     return cfg['repo_dir'], cfg['quarantine_dir'], cfg['show_media_dir']
 
 
+def _run_proxy(p, res_factor, alpha):
+    return ffmpeg_proxy(p, res_factor=res_factor, alpha=alpha)
+
+
+def _run_audio(p, out_dir):
+    return ffmpeg_extract_audio(p, out_dir)
+
+
+JOB_HANDLERS = {
+    'proxy': _run_proxy,
+    'audio': _run_audio,
+}
+
+
+def _finish_file_task(job_id, out):
+    with JOBS_LOCK:
+        state = JOBS[job_id]
+        state['outputs'].append(out)
+        state['pending'] -= 1
+        state['status'] = 'done' if state['pending'] <= 0 else 'running'
+        if state['pending'] <= 0:
+            _JOB_FINISHED[job_id] = time.monotonic()
+        JOBS_LOCK.notify_all()
+    # Proxies land inside the repo
+    invalidate_scan()
+
+
+def get_scan_records(repo_dir, force=False):
+    """Return the cached scan of repo_dir, walking the tree if there is none or force is set."""
+    global _SCAN_RESULT
+    cached = _SCAN_RESULT
+    if SCAN_REFRESH_SEC > 0 and not force and cached and cached[0] == repo_dir:
+        return cached[1]
+    requested = time.monotonic()
+    with _SCAN_MUTEX:
+        cached = _SCAN_RESULT
+        # Someone else started a walk after we asked while we waited on the mutex; use theirs
+        if cached and cached[0] == repo_dir and cached[2] >= requested:
+            return cached[1]
+        started = time.monotonic()
+        gen = _SCAN_GEN
+        records = scan_repo(repo_dir, workers=SCAN_WORKERS)
+        with _SCAN_GEN_LOCK:
+            # Files moved while we walked: these records may predate the move
+            if gen == _SCAN_GEN:
+                _SCAN_RESULT = (repo_dir, records, started)
+        return records
+
+
+def invalidate_scan():
+    global _SCAN_RESULT, _SCAN_GEN
+    with _SCAN_GEN_LOCK:
+        _SCAN_GEN += 1
+        _SCAN_RESULT = None
+
+
+def _scan_refresher():
+    while True:
+        time.sleep(SCAN_REFRESH_SEC)
+        try:
+            repo_dir = load_settings()['repo_dir']
+            if os.path.isdir(repo_dir):
+                get_scan_records(repo_dir, force=True)
+        except Exception as e:
+            print(f"⚠️ Background scan failed: {e}")
+
+
+def _job_worker():
+    while True:
+        job_id, kind, args = JOB_QUEUE.get()
+        try:
+            if kind == 'call':
+                # Whole-batch task (e.g. sequential moves) that manages its own JOBS state
+                args[0]()
+                continue
+            try:
+                out = JOB_HANDLERS[kind](*args)
+            except Exception as e:
+                out = f"ERROR:{args[0]}:{e}"
+            _finish_file_task(job_id, out)
+        except Exception as e:
+            print(f"❌ Job worker error in {job_id}: {e}")
+        finally:
+            JOB_QUEUE.task_done()
+
+
+def new_job_id(kind):
+    with JOBS_LOCK:
+        return f"{kind}:{next(_JOB_SEQ)}"
+
+
+def _job_reaper():
+    while True:
+        time.sleep(300)
+        cutoff = time.monotonic() - JOB_TTL
+        with JOBS_LOCK:
+            for job_id in [j for j, t in _JOB_FINISHED.items() if t < cutoff]:
+                JOBS.pop(job_id, None)
+                del _JOB_FINISHED[job_id]
+
+
+def enqueue_file_job(job_id, kind, arg_list):
+    """Register a job and queue one task per file; files that don't fit in the queue are reported as errors."""
+    with JOBS_LOCK:
+        JOBS[job_id] = {'status': 'queued' if arg_list else 'done', 'outputs': [],
+                        'pending': len(arg_list), 'total': len(arg_list)}
+        if not arg_list:
+            _JOB_FINISHED[job_id] = time.monotonic()
+    for args in arg_list:
+        try:
+            JOB_QUEUE.put_nowait((job_id, kind, args))
+        except queue.Full:
+            _finish_file_task(job_id, f"ERROR:{args[0]}:job queue is full")
+
+
+def enqueue_call(job_id, fn):
+    """Queue a single callable that runs a whole batch in order. Returns False if the queue is full."""
+    try:
+        JOB_QUEUE.put_nowait((job_id, 'call', (fn,)))
+        return True
+    except queue.Full:
+        return False
+
+
+for _ in range(JOB_WORKERS):
+    threading.Thread(target=_job_worker, daemon=True).start()
+threading.Thread(target=_job_reaper, daemon=True).start()
+if SCAN_REFRESH_SEC > 0:
+    threading.Thread(target=_scan_refresher, daemon=True).start()
+
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -95,7 +375,7 @@ def api_settings():
 
         # Handle multipart form (HTML form upload)
         else:
-            for key in ['sheet_name', 'repo_dir', 'quarantine_dir', 'show_media_dir', 'service_account_json']:
+            for key in SETTINGS_TEXT_KEYS:
                 if key in request.form and request.form[key].strip():
                     payload[key] = request.form[key].strip()
 
@@ -108,51 +388,69 @@ def api_settings():
             # Service account JSON file upload
             if 'sa_json' in request.files and request.files['sa_json']:
                 f = request.files['sa_json']
-                os.makedirs(CONFIG_DIR, exist_ok=True)
-                path = os.path.join(CONFIG_DIR, 'google-service-account.json')
-                f.save(path)
-                payload['service_account_json'] = path
+                _ensure_config_dir()
+                f.save(SA_UPLOAD_PATH)
+                payload['service_account_json'] = SA_UPLOAD_PATH
 
     except Exception as e:
         return jsonify({'error': f'Invalid settings payload: {e}'}), 400
 
     # Merge into cfg
-    for key in ['sheet_name', 'repo_dir', 'quarantine_dir', 'show_media_dir', 'service_account_json', 'use_robocopy']:
+    for key in SETTINGS_KEYS:
         if key in payload:
             cfg[key] = payload[key]
 
     # Validate required fields
-    missing = [k for k in ['sheet_name','repo_dir','quarantine_dir','show_media_dir','service_account_json'] if not cfg.get(k)]
+    missing = [k for k in SETTINGS_TEXT_KEYS if not cfg.get(k)]
     if missing:
         return jsonify({'error': f"Missing fields: {', '.join(missing)}"}), 400
 
-    # Write atomically
-    fd, tmp = tempfile.mkstemp(dir=CONFIG_DIR, prefix='settings.', suffix='.json')
-    with os.fdopen(fd, 'w', encoding='utf-8') as f:
-        json.dump(cfg, f, indent=2)
-    shutil.move(tmp, SETTINGS_PATH)
+    save_settings(cfg)
 
     return jsonify({'status': 'ok', 'settings': cfg})
 
 
+def _stream_json_records(records, batch=256):
+    """Yield {"records": [...]} as bytes, a batch of records at a time, so the full document never sits in memory."""
+    yield b'{"records":['
+    first = True
+    chunk = []
+    for rec in records:
+        if not first:
+            chunk.append(b',')
+        first = False
+        chunk.append(orjson.dumps(rec))
+        if len(chunk) >= batch:
+            yield b''.join(chunk)
+            chunk.clear()
+    if chunk:
+        yield b''.join(chunk)
+    yield b']}'
+
+
 @app.route('/api/scan')
 def api_scan():
     try:
         repo_dir, _, _ = cfg_paths()
     except Exception as e:
         return jsonify({'error': f'Failed to load settings: {e}', 'records': []}), 500
-    if not os.path.isdir(repo_dir):
+    if not isdir_cached(repo_dir):
         return jsonify({'error': f'Repo folder does not exist or is not a directory: {repo_dir}', 'records': []}), 400
-    data = scan_repo(repo_dir)
-    return jsonify({'records': data})
+    if SCAN_REFRESH_SEC > 0:
+        force = request.args.get('force') in ('1', 'true')
+        records = get_scan_records(repo_dir, force=force)
+    else:
+        # No cache to fill: emit records as the walk produces them
+        records = iter_scan_repo(repo_dir, workers=SCAN_WORKERS)
+    return Response(_stream_json_records(records), mimetype='application/json', direct_passthrough=True)
 
 
 @app.route('/api/move', methods=['POST'])
 def api_move():
     from datetime import datetime
 
-    repo_dir, quarantine_dir, show_media_dir = cfg_paths()
     cfg = load_settings()
+    repo_dir, quarantine_dir, show_media_dir = cfg_paths(cfg)
     use_robocopy = cfg.get('use_robocopy', False)
 
     # Get Google Sheets config for logging
@@ -181,8 +479,8 @@ def api_move():
             if log_to_sheets:
                 try:
                     timestamp = datetime.utcnow().isoformat() + 'Z'
-                    log_upload(sa_json, sheet_name, newp, timestamp)
-                    print(f"✅ Logged to upload_log: {newp}")
+                    upload_log_buffer.add(sa_json, sheet_name, newp, timestamp)
+                    print(f"✅ Queued for upload_log: {newp}")
                 except Exception as e:
                     # Don't fail the move if logging fails
                     import traceback
@@ -192,6 +490,7 @@ def api_move():
         except Exception as e:
             errors.append(f"{p}: {e}")
 
+    invalidate_scan()
     if errors:
         return jsonify({'error': errors, 'moved': moved}), 400
     return jsonify({'moved': moved})
@@ -203,20 +502,8 @@ def api_proxy():
     res_factor = int(payload.get('res_factor', 2))
     alpha = bool(payload.get('alpha', False))
 
-    job_id = f"proxy:{len(JOBS)+1}"
-    JOBS[job_id] = {'status': 'queued', 'outputs': []}
-
-    def run():
-        outs = []
-        for p in paths:
-            try:
-                o = ffmpeg_proxy(p, res_factor=res_factor, alpha=alpha)
-                outs.append(o)
-            except Exception as e:
-                outs.append(f"ERROR:{p}:{e}")
-        JOBS[job_id] = {'status': 'done', 'outputs': outs}
-
-    executor.submit(run)
+    job_id = new_job_id('proxy')
+    enqueue_file_job(job_id, 'proxy', [(p, res_factor, alpha) for p in paths])
     return jsonify({'job_id': job_id})
 
 
@@ -226,40 +513,79 @@ def api_extract_audio():
     paths = payload.get('paths', [])
     out_dir = payload.get('out_dir')
 
-    job_id = f"audio:{len(JOBS)+1}"
-    JOBS[job_id] = {'status': 'queued', 'outputs': []}
+    job_id = new_job_id('audio')
+    enqueue_file_job(job_id, 'audio', [(p, out_dir) for p in paths])
+    return jsonify({'job_id': job_id})
 
-    def run():
-        outs = []
-        for p in paths:
-            try:
-                o = ffmpeg_extract_audio(p, out_dir)
-                outs.append(o)
-            except Exception as e:
-                outs.append(f"ERROR:{p}:{e}")
-        JOBS[job_id] = {'status': 'done', 'outputs': outs}
 
-    executor.submit(run)
-    return jsonify({'job_id': job_id})
+def _job_snapshot(job_id):
+    """Copy of a job's state; call with JOBS_LOCK held."""
+    job = JOBS.get(job_id, {'status': 'unknown'})
+    # Lists keep growing in worker threads; copy them while we hold the lock
+    return {k: list(v) if isinstance(v, list) else v for k, v in job.items()}
 
 
 @app.route('/api/jobs/<job_id>')
 def api_job(job_id):
-    return jsonify(JOBS.get(job_id, {'status': 'unknown'}))
+    with JOBS_LOCK:
+        snapshot = _job_snapshot(job_id)
+    return jsonify(snapshot)
+
+
+@app.route('/api/jobs/stream')
+def api_jobs_stream():
+    """
+    One SSE stream for every job a page is watching (?ids=a,b,c), so concurrent
+    jobs share one connection and one server thread. Each event is
+    {"id": ..., "job": snapshot}, sent only when that job changed; the stream
+    ends once all of them have finished.
+    """
+    ids = [i for i in request.args.get('ids', '').split(',') if i][:JOB_STREAM_MAX_IDS]
+
+    def generate():
+        pending = set(ids)
+        last = {}
+
+        def changed():
+            out = []
+            for job_id in pending:
+                snapshot = _job_snapshot(job_id)
+                payload = orjson.dumps(snapshot)
+                if payload != last.get(job_id):
+                    out.append((job_id, snapshot, payload))
+            return out
+
+        while pending:
+            with JOBS_LOCK:
+                updates = changed()
+                if not updates:
+                    JOBS_LOCK.wait(timeout=SSE_KEEPALIVE)
+                    updates = changed()
+            if not updates:
+                yield b': keepalive\n\n'
+                continue
+            for job_id, snapshot, payload in updates:
+                last[job_id] = payload
+                yield b'data: ' + orjson.dumps({'id': job_id, 'job': snapshot}) + b'\n\n'
+                if snapshot.get('status') in ('done', 'done_with_errors', 'unknown'):
+                    pending.discard(job_id)
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 @app.route('/api/sync-sheets', methods=['POST'])
 def api_sync_sheets():
     from datetime import datetime
     import traceback
     try:
-        repo_dir, quarantine_dir, show_media_dir = cfg_paths()
         cfg = load_settings()
+        repo_dir = cfg['repo_dir']
         sa = cfg.get('service_account_json')
         sheet = cfg.get('sheet_name')
 
         if not sheet:
             return jsonify({'error': 'Missing sheet_name in settings. Please configure in Settings page.'}), 400
-        if not sa or not os.path.isfile(sa):
+        if not sa or not isfile_cached(sa):
             return jsonify({'error': f'Service account JSON not found. Please upload in Settings page.'}), 400
 
         # Check if service account JSON file is empty
@@ -267,7 +593,7 @@ def api_sync_sheets():
             return jsonify({'error': 'Service account JSON file is empty. Please re-upload the file in Settings page.'}), 400
 
         print(f"📊 Starting Google Sheets sync to '{sheet}'...")
-        records = scan_repo(repo_dir)
+        records = get_scan_records(repo_dir)
         print(f"📊 Found {len(records)} records to sync")
 
         # Try open by ID/URL or by name
@@ -291,6 +617,8 @@ def api_sync_sheets():
         except Exception as e:
             print(f"❌ Sync failed: {e}")
             traceback.print_exc()
+            # The cached worksheet handle may be stale (tab deleted/renamed); reopen next time
+            forget_sheets()
             return jsonify({'error': f'Failed to sync records: {str(e)}'}), 400
 
         # Also log scanned repo files to upload_log
@@ -298,15 +626,10 @@ def api_sync_sheets():
         print("📊 Syncing upload_log for scanned repo files...")
         try:
             timestamp = datetime.utcnow().isoformat() + 'Z'
-            for file_record in records:
-                try:
-                    file_path = file_record.get('path', '')
-                    if file_path:
-                        log_upload(sa, sheet, file_path, timestamp)
-                        logged_count += 1
-                        print(f"  ✅ Logged: {os.path.basename(file_path)}")
-                except Exception as e:
-                    print(f"  ⚠️ Failed to log {file_path}: {e}")
+            # Written now in one append, so the count is exactly this request's rows
+            logged_count = upload_log_buffer.write(
+                sa, sheet, [r.path for r in records if r.path], timestamp
+            )
             print(f"📊 Upload log sync complete: {logged_count} files logged")
         except Exception as e:
             print(f"⚠️ Warning: Failed to sync upload_log: {e}")
@@ -321,8 +644,8 @@ def api_sync_sheets():
 
 @app.route('/api/move-async', methods=['POST'])
 def api_move_async():
-    repo_dir, quarantine_dir, show_media_dir = cfg_paths()
     cfg = load_settings()
+    repo_dir, quarantine_dir, show_media_dir = cfg_paths(cfg)
     use_robocopy = cfg.get('use_robocopy', False)
 
     payload = request.get_json(force=True) or {}
@@ -340,10 +663,13 @@ def api_move_async():
     def fsize(p):
         try: return os.path.getsize(p)
         except Exception: return 0
-    total_bytes = sum(fsize(p) for p in paths)
+    # One stat per file; run() reuses these for the byte tally
+    sizes = {p: fsize(p) for p in paths}
+    total_bytes = sum(sizes.values())
 
-    job_id = f"move:{len(JOBS)+1}"
-    JOBS[job_id] = {
+    job_id = new_job_id('move')
+    # Allocated once; the worker mutates individual keys under JOBS_LOCK
+    state = {
         'status': 'queued',
         'moved': 0,              # files moved
         'total': len(paths),     # total files
@@ -355,6 +681,8 @@ def api_move_async():
         'current': None,         # currently moving file
         'current_pct': 0
     }
+    with JOBS_LOCK:
+        JOBS[job_id] = state
 
     def run():
         moved_count = 0
@@ -363,43 +691,40 @@ def api_move_async():
         from media_utils import move_one_fast, move_with_robocopy
         from datetime import datetime
 
-        # Get Google Sheets config for logging
+        # Get Google Sheets config for logging (settings already loaded by the request)
         try:
-            sheets_cfg = load_settings()
-            sa_json = sheets_cfg.get('service_account_json')
-            sheet_name = sheets_cfg.get('sheet_name')
+            sa_json = cfg.get('service_account_json')
+            sheet_name = cfg.get('sheet_name')
             log_to_sheets = bool(sa_json and sheet_name and os.path.isfile(sa_json))
             print(f"📊 Upload logging (async): {'ENABLED' if log_to_sheets else 'DISABLED'} (sa_json={sa_json}, exists={os.path.isfile(sa_json) if sa_json else False})")
         except Exception as e:
             print(f"❌ Failed to load sheets config for logging: {e}")
             log_to_sheets = False
 
-        for p in paths:
-            # progress callback for a single file
-            def on_progress(bytes_so_far, pct):
-                # bytes_so_far is per-file; convert to global-ish gauge:
-                # We can't know previously moved bytes for this file, so we only
-                # use pct for UI, and set 'current_pct'
-                JOBS[job_id].update({
-                    'status': 'running',
-                    'current': p,
-                    'current_pct': pct,
-                    'moved': moved_count,
-                    'bytes': bytes_moved
-                })
+        last_progress = [0.0]
 
+        def on_progress(bytes_so_far, pct):
+            # bytes_so_far is per-file; we only surface pct for the current file.
+            # Copy tools report many times per second, so publish at most every 100ms.
+            now = time.monotonic()
+            if pct < 100 and now - last_progress[0] < PROGRESS_INTERVAL:
+                return
+            last_progress[0] = now
+            with JOBS_LOCK:
+                state['current_pct'] = pct
+                JOBS_LOCK.notify_all()
+
+        for p in paths:
             try:
                 # update current file start
-                JOBS[job_id].update({
-                    'status': 'running',
-                    'current': p,
-                    'current_pct': 0,
-                    'moved': moved_count,
-                    'bytes': bytes_moved
-                })
+                with JOBS_LOCK:
+                    state['status'] = 'running'
+                    state['current'] = p
+                    state['current_pct'] = 0
+                    JOBS_LOCK.notify_all()
 
                 # record size before move for global bytes tally
-                size_before = fsize(p)
+                size_before = sizes[p]
                 if use_robocopy and platform.system() == 'Windows':
                     newp = move_with_robocopy(p, dest, repo_dir=repo_dir)
                 else:
@@ -409,8 +734,8 @@ def api_move_async():
                 if log_to_sheets:
                     try:
                         timestamp = datetime.utcnow().isoformat() + 'Z'
-                        log_upload(sa_json, sheet_name, newp, timestamp)
-                        print(f"✅ Logged to upload_log: {newp}")
+                        upload_log_buffer.add(sa_json, sheet_name, newp, timestamp)
+                        print(f"✅ Queued for upload_log: {newp}")
                     except Exception as e:
                         # Don't fail the move if logging fails
                         import traceback
@@ -420,38 +745,42 @@ def api_move_async():
                 moved_count += 1
                 bytes_moved += size_before
 
-                JOBS[job_id].update({
-                    'status': 'running',
-                    'current': None,
-                    'current_pct': 100,
-                    'moved': moved_count,
-                    'bytes': bytes_moved
-                })
+                with JOBS_LOCK:
+                    state['current'] = None
+                    state['current_pct'] = 100
+                    state['moved'] = moved_count
+                    state['bytes'] = bytes_moved
+                    JOBS_LOCK.notify_all()
 
             except Exception as e:
                 errors.append(f"{p}: {e}")
-                JOBS[job_id].update({
-                    'status': 'running',
-                    'current': None,
-                    'current_pct': 0,
-                    'moved': moved_count,
-                    'bytes': bytes_moved,
-                    'errors': errors
-                })
-
-        final_status = 'done_with_errors' if errors else 'done'
-        JOBS[job_id].update({
-            'status': final_status,
-            'moved': moved_count,
-            'bytes': bytes_moved,
-            'errors': errors,
-            'current': None,
-            'current_pct': 0
-        })
-
-    executor.submit(run)
+                with JOBS_LOCK:
+                    state['current'] = None
+                    state['current_pct'] = 0
+                    state['errors'] = list(errors)
+                    JOBS_LOCK.notify_all()
+
+        invalidate_scan()
+        with JOBS_LOCK:
+            state['status'] = 'done_with_errors' if errors else 'done'
+            _JOB_FINISHED[job_id] = time.monotonic()
+            state['moved'] = moved_count
+            state['bytes'] = bytes_moved
+            state['errors'] = errors
+            state['current'] = None
+            state['current_pct'] = 0
+            JOBS_LOCK.notify_all()
+
+    if not enqueue_call(job_id, run):
+        with JOBS_LOCK:
+            state['status'] = 'done_with_errors'
+            _JOB_FINISHED[job_id] = time.monotonic()
+            state['errors'] = ['Job queue is full, try again shortly']
+            JOBS_LOCK.notify_all()
+        return jsonify({'error': 'Job queue is full, try again shortly', 'job_id': job_id}), 503
     return jsonify({'job_id': job_id}), 202
 
 
 if __name__ == '__main__':
+    # Local development only; the container runs gunicorn (see Dockerfile)
     app.run(host='0.0.0.0', port=8008, debug=True)
\ No newline at end of file
@@ -17,12 +17,17 @@ To use the web configurator:
 Then open http://localhost:8009 in your browser.
 """
 
-import os, sys, subprocess, platform, json, shlex
+import os, sys, subprocess, platform, json, shlex, shutil
 import tkinter as tk
 from tkinter import filedialog, messagebox
 import webbrowser
 import threading
 import time
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from string import Template
 
 # --- Quiet subprocess helpers (add under imports) ---
 def _win_si():
@@ -33,10 +38,10 @@ def _win_si():
     flags = subprocess.CREATE_NO_WINDOW
     return si, flags
 
-def run_quiet(cmd, cwd=None):
+def run_quiet(cmd, cwd=None, env=None):
     si, flags = _win_si()
     return subprocess.run(
-        cmd, cwd=cwd,
+        cmd, cwd=cwd, env=env,
         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
         text=True,
         startupinfo=si, creationflags=flags
@@ -52,32 +57,60 @@ def run_capture(cmd, cwd=None):
     )
     return p.returncode, p.stdout
 
+STREAM_READ_SIZE = 8192
+STREAM_PIPE_SIZE = 1 << 20  # Linux pipe buffer for followed output; the default is 64 KiB
+
+def _grow_pipe(f):
+    # Best effort: a bigger pipe lets `docker logs -f` write bursts without blocking and
+    # lets each read1 drain more at once. Capped by /proc/sys/fs/pipe-max-size.
+    if sys.platform != "linux":
+        return
+    try:
+        import fcntl
+        fcntl.fcntl(f.fileno(), fcntl.F_SETPIPE_SZ, STREAM_PIPE_SIZE)
+    except (ImportError, AttributeError, OSError):
+        pass
+
+def _pump_lines(p, on_line):
+    # read1 returns whatever the pipe has (up to 8 KiB) in one syscall, instead of one read per line
+    buf = b""
+    while chunk := p.stdout.read1(STREAM_READ_SIZE):
+        buf += chunk
+        *lines, buf = buf.split(b"\n")
+        if on_line:
+            for line in lines:
+                on_line(line.decode("utf-8", errors="replace").rstrip("\r"))
+    if buf and on_line:
+        on_line(buf.decode("utf-8", errors="replace").rstrip("\r"))
+    p.wait()
+    if on_line: on_line(f"[process exited {p.returncode}]")
+
 def run_stream_quiet(cmd, cwd=None, on_line=None):
     si, flags = _win_si()
     p = subprocess.Popen(
         cmd, cwd=cwd,
         stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
-        text=True, bufsize=1,
+        bufsize=STREAM_READ_SIZE,
         startupinfo=si, creationflags=flags
     )
-    def pump():
-        for line in p.stdout:
-            if on_line: on_line(line.rstrip("\n"))
-        p.wait()
-        if on_line: on_line(f"[process exited {p.returncode}]")
-    t = threading.Thread(target=pump, daemon=True)
+    _grow_pipe(p.stdout)
+    t = threading.Thread(target=_pump_lines, args=(p, on_line), daemon=True)
     t.start()
     return p
 # --- end helpers ---
 
 
+# Local builds go through BuildKit so the Dockerfile's pip cache mount is reused between builds
+BUILDKIT_ENV = {"DOCKER_BUILDKIT": "1", "COMPOSE_DOCKER_CLI_BUILD": "1"}
+
 APP_SERVICE_NAME = "media"  # the service name in docker-compose
 DEFAULT_SHEET_NAME = "Media Repo Inventory"
 
-COMPOSE_TEMPLATE = """
+# One template for both deploy modes; only the image:/build: line differs
+COMPOSE_TEMPLATE = Template("""
 services:
   media:
-    build: .
+    $source_line
     ports:
       - "8008:8008"
     environment:
@@ -86,66 +119,41 @@ services:
       QUARANTINE_DIR: /repo_quarantine
       CONFIG_DIR: /config
       GOOGLE_SERVICE_ACCOUNT_JSON: /config/google-service-account.json
-      GOOGLE_SHEET_NAME: {sheet_name}
+      GOOGLE_SHEET_NAME: $sheet_name
     volumes:
-      - "{repo_host}:/repo:rw"
-      - "{show_host}:/repo_show:rw"
-      - "{quarantine_host}:/repo_quarantine:rw"
+      - "$repo_host:/repo:rw"
+      - "$show_host:/repo_show:rw"
+      - "$quarantine_host:/repo_quarantine:rw"
       - "./config:/config:rw"
-"""
-
-COMPOSE_IMAGE = """
-services:
-  media:
-    image: {image_ref}
-    ports:
-      - "8008:8008"
-    environment:
-      REPO_DIR: /repo
-      SHOW_MEDIA_DIR: /repo_show
-      QUARANTINE_DIR: /repo_quarantine
-      CONFIG_DIR: /config
-      GOOGLE_SERVICE_ACCOUNT_JSON: /config/google-service-account.json
-      GOOGLE_SHEET_NAME: {sheet_name}
-    volumes:
-      - "{repo_host}:/repo:rw"
-      - "{show_host}:/repo_show:rw"
-      - "{quarantine_host}:/repo_quarantine:rw"
-      - "./config:/config:rw"
-"""
-
-COMPOSE_BUILD = """
-services:
-  media:
-    build: .
-    ports:
-      - "8008:8008"
-    environment:
-      REPO_DIR: /repo
-      SHOW_MEDIA_DIR: /repo_show
-      QUARANTINE_DIR: /repo_quarantine
-      CONFIG_DIR: /config
-      GOOGLE_SERVICE_ACCOUNT_JSON: /config/google-service-account.json
-      GOOGLE_SHEET_NAME: {sheet_name}
-    volumes:
-      - "{repo_host}:/repo:rw"
-      - "{show_host}:/repo_show:rw"
-      - "{quarantine_host}:/repo_quarantine:rw"
-      - "./config:/config:rw"
-"""
+""")
+
+@lru_cache(maxsize=8)
+def render_compose(mode, image_ref, repo_host, show_host, quarantine_host, sheet_name):
+    return COMPOSE_TEMPLATE.substitute(
+        source_line=f"image: {image_ref}" if mode == "image" else "build: .",
+        repo_host=repo_host,
+        show_host=show_host,
+        quarantine_host=quarantine_host,
+        sheet_name=sheet_name,
+    )
 
 
 def which(cmd):
     from shutil import which as w
     return w(cmd)
 
+_COMPOSE_CMD = None
+
 def docker_compose_cmd():
-    # Prefer "docker compose", fallback to "docker-compose"
-    if which("docker") and "compose" in subprocess.getoutput("docker --help"):
-        return ["docker", "compose"]
-    if which("docker-compose"):
-        return ["docker-compose"]
-    return None
+    # Prefer "docker compose", fallback to "docker-compose". The answer doesn't change
+    # while the app is open, so probe once; a miss is retried in case Docker gets installed.
+    global _COMPOSE_CMD
+    if _COMPOSE_CMD is None:
+        if which("docker") and run_quiet(["docker", "compose", "version", "--short"]) == 0:
+            _COMPOSE_CMD = ["docker", "compose"]
+        elif which("docker-compose"):
+            _COMPOSE_CMD = ["docker-compose"]
+    return _COMPOSE_CMD
 
 def run(cmd, cwd=None):
     p = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
@@ -158,13 +166,8 @@ def run(cmd, cwd=None):
 
 def run_stream(cmd, cwd=None, on_line=None):
     """Run a command and stream lines via callback without blocking the UI."""
-    p = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1)
-    def pump():
-        for line in p.stdout:
-            if on_line: on_line(line.rstrip("\n"))
-        p.wait()
-        if on_line: on_line(f"[process exited {p.returncode}]")
-    t = threading.Thread(target=pump, daemon=True)
+    p = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, bufsize=STREAM_READ_SIZE)
+    t = threading.Thread(target=_pump_lines, args=(p, on_line), daemon=True)
     t.start()
     return p
 
@@ -269,7 +272,9 @@ class Configurator(tk.Tk):
         stat.pack(fill="x", padx=10)
 
 
-        # Console
+        # Console; log() batches lines and inserts them at most once per frame
+        self._pending = []
+        self._flush_pending = False
         self.console = tk.Text(self, height=10, bg="#111", fg="#e9e", insertbackground="#fff")
         self.console.pack(fill="both", expand=True, padx=10, pady=10)
         self.log("Tip: Ensure Docker Desktop has access to the folders you select (File Sharing).")
@@ -277,6 +282,12 @@ class Configurator(tk.Tk):
 
         self.update_buttons()
         self.log_proc = None
+        self.container_id = None  # app container found by the last status check
+        # Docker calls run on the pool and log lines arrive on the queue, so the Tk thread never blocks on them
+        self._exec = ThreadPoolExecutor(max_workers=2)
+        self._status_future = None
+        self._log_q = queue.Queue()
+        self.after(50, self._drain_log)
         self.after(2000, self.refresh_status)   # initial status probe
         self.after(5000, self.status_poll)      # start periodic polling
 
@@ -304,7 +315,31 @@ class Configurator(tk.Tk):
 
 
     def log(self, msg):
-        self.console.insert("end", msg + "\n"); self.console.see("end"); self.update()
+        self._pending.append(msg)
+        if not self._flush_pending:
+            self._flush_pending = True
+            self.after(16, self._flush_log)
+
+    def _flush_log(self):
+        self._flush_pending = False
+        if not self._pending:
+            return
+        self.console.insert("end", "\n".join(self._pending) + "\n")
+        self.console.see("end")
+        self._pending.clear()
+        self.update_idletasks()
+
+    def _drain_log(self):
+        # Lines queued by background threads; only the Tk thread touches the console
+        lines = []
+        while True:
+            try:
+                lines.append(self._log_q.get_nowait())
+            except queue.Empty:
+                break
+        if lines:
+            self.log("\n".join(lines))
+        self.after(50, self._drain_log)
 
     def pick_dir(self, var):
         d = filedialog.askdirectory()
@@ -333,17 +368,15 @@ class Configurator(tk.Tk):
     def write_compose(self):
         if not self.validate(): return
         mode = self.deploy_mode.get()
-        template = COMPOSE_IMAGE if mode == "image" else COMPOSE_BUILD
-        compose_text = template.format(
-            image_ref=self.image_ref.get(),
-            repo_host=self.repo.get(),
-            show_host=self.show.get(),
-            quarantine_host=self.quarantine.get(),
-            config_host=self.config.get(),
-            sheet_name=self.sheet.get().replace('"', '\\"')
+        compose_text = render_compose(
+            mode,
+            self.image_ref.get(),
+            self.repo.get(),
+            self.show.get(),
+            self.quarantine.get(),
+            self.sheet.get().replace('"', '\\"'),
         )
-        with open("docker-compose.yml", "w", encoding="utf-8") as f:
-            f.write(compose_text)
+        Path("docker-compose.yml").write_text(compose_text, encoding="utf-8")
         self.log("✅ Wrote docker-compose.yml (" + ("image" if mode=="image" else "build") + ")")
         self.log(compose_text)
 
@@ -355,8 +388,7 @@ class Configurator(tk.Tk):
         os.makedirs(self.config.get(), exist_ok=True)
         dst = os.path.join(self.config.get(), "google-service-account.json")
         try:
-            with open(src, "rb") as s, open(dst, "wb") as d:
-                d.write(s.read())
+            shutil.copyfile(src, dst)
             self.log(f"✅ Copied service account to: {dst}")
         except Exception as e:
             messagebox.showerror("Copy Failed", str(e))
@@ -369,10 +401,41 @@ class Configurator(tk.Tk):
         return list(base) + list(args)
 
     def refresh_status(self):
-        cmd = self.docker_cmd("ps", "-q")
-        if not cmd: return
-        code, out = run_capture(cmd, cwd=os.getcwd())
-        running = bool(out.strip())
+        if self._status_future and not self._status_future.done():
+            return  # previous check still running
+        fut = self._exec.submit(self._query_status)
+        fut.add_done_callback(lambda f: self.after(0, self._apply_status, f))
+        self._status_future = fut
+
+    def _query_status(self):
+        # Runs on the executor: no Tk calls in here. Returns None when Docker isn't available.
+        running = None
+        if self.container_id:
+            # Asking the daemon about a known container skips compose's YAML parsing and project lookup
+            code, out = run_capture(["docker", "inspect", "-f", "{{.State.Running}}", self.container_id])
+            if code == 0:
+                running = out.strip() == "true"
+            else:
+                self.container_id = None  # removed or replaced; find it again below
+        if running is None:
+            base = docker_compose_cmd()
+            if not base: return None
+            cmd = base + ["ps", "-q", APP_SERVICE_NAME]
+            code, out = run_capture(cmd, cwd=os.getcwd())
+            ids = out.split() if code == 0 else []
+            self.container_id = ids[0] if ids else None
+            running = bool(ids)
+        return running
+
+    def _apply_status(self, fut):
+        try:
+            running = fut.result()
+        except Exception as e:
+            self.log(f"❌ Status check failed: {e}")
+            return
+        if running is None:
+            self.status_var.set("Status: unknown (Docker not found)")
+            return
         self.status_var.set("Status: RUNNING" if running else "Status: STOPPED")
         self.btn_open.configure(state=("normal" if running else "disabled"))
 
@@ -395,14 +458,20 @@ class Configurator(tk.Tk):
         if self.deploy_mode.get() == "image":
             pull_cmd = cmd_base + ["pull"]
             self.log("Running: " + " ".join(shlex.quote(x) for x in pull_cmd))
+            self._flush_log()
             run_quiet(pull_cmd, cwd=os.getcwd())
 
         up_cmd = cmd_base + ["up", "-d"]
+        env = None
         if self.deploy_mode.get() == "build":
             up_cmd += ["--build"]
+            env = {**os.environ, **BUILDKIT_ENV}
+            self.check_dockerfile_syntax()
 
         self.log("Running: " + " ".join(shlex.quote(x) for x in up_cmd))
-        code = run_quiet(up_cmd, cwd=os.getcwd())
+        self._flush_log()
+        code = run_quiet(up_cmd, cwd=os.getcwd(), env=env)
+        self.container_id = None  # up may have recreated the container
 
         if code == 0:
             self.log("🚀 App started. Open http://localhost:8008")
@@ -411,11 +480,23 @@ class Configurator(tk.Tk):
 
         self.refresh_status()
 
+    def check_dockerfile_syntax(self):
+        # RUN --mount needs the dockerfile:1 frontend; older Dockerfiles still build, just without the cache
+        try:
+            with open("Dockerfile", encoding="utf-8") as f:
+                first = f.readline()
+        except OSError:
+            return
+        if not first.startswith("# syntax=docker/dockerfile:1"):
+            self.log("⚠️ Dockerfile has no '# syntax=docker/dockerfile:1' line; BuildKit cache mounts won't be used.")
+
     def compose_down(self):
         cmd = self.docker_cmd("down")
         if not cmd: return
         self.log("Running: " + " ".join(shlex.quote(x) for x in cmd))
+        self._flush_log()
         code = run_quiet(cmd, cwd=os.getcwd())
+        self.container_id = None
         if code == 0:
             self.log("🛑 App stopped.")
         else:
@@ -426,6 +507,7 @@ class Configurator(tk.Tk):
         cmd = self.docker_cmd("restart")
         if not cmd: return
         self.log("Running: " + " ".join(shlex.quote(x) for x in cmd))
+        self._flush_log()
         code = run_quiet(cmd, cwd=os.getcwd())
         if code == 0:
             self.log("🔁 App restarted.")
@@ -442,8 +524,7 @@ class Configurator(tk.Tk):
         self.log("Following logs… (click 'Stop Logs' to end)")
         self.btn_logs.configure(state="disabled")
         self.btn_stoplogs.configure(state="normal")
-        def on_line(line): self.log(line)
-        self.log_proc = run_stream_quiet(cmd, cwd=os.getcwd(), on_line=on_line)
+        self.log_proc = run_stream_quiet(cmd, cwd=os.getcwd(), on_line=self._log_q.put)
 
     def stop_logs(self):
         if not self.log_proc: return
@@ -4,12 +4,14 @@ Ported from the legacy Tkinter configurator.
 """
 
 import os
+from functools import lru_cache
+from string import Template
 
 DEFAULT_SHEET_NAME = "Media Repo Inventory"
 
 COMPOSE_IMAGE_TEMPLATE = """services:
   media:
-    image: {image_ref}
+    image: $image_ref
     ports:
       - "8008:8008"
     environment:
@@ -18,11 +20,12 @@ COMPOSE_IMAGE_TEMPLATE = """services:
       QUARANTINE_DIR: /repo_quarantine
       CONFIG_DIR: /config
       GOOGLE_SERVICE_ACCOUNT_JSON: /config/google-service-account.json
-      GOOGLE_SHEET_NAME: {sheet_name}
+      GOOGLE_SHEET_NAME: $sheet_name
+      GUNICORN_CMD_ARGS: "--worker-class gthread --workers 1 --threads 16 --timeout 0"
     volumes:
-      - "{repo_host}:/repo:rw"
-      - "{show_host}:/repo_show:rw"
-      - "{quarantine_host}:/repo_quarantine:rw"
+      - "$repo_host:/repo:rw"
+      - "$show_host:/repo_show:rw"
+      - "$quarantine_host:/repo_quarantine:rw"
       - "./config:/config:rw"
 """
 
@@ -37,14 +40,33 @@ COMPOSE_BUILD_TEMPLATE = """services:
       QUARANTINE_DIR: /repo_quarantine
       CONFIG_DIR: /config
       GOOGLE_SERVICE_ACCOUNT_JSON: /config/google-service-account.json
-      GOOGLE_SHEET_NAME: {sheet_name}
+      GOOGLE_SHEET_NAME: $sheet_name
+      GUNICORN_CMD_ARGS: "--worker-class gthread --workers 1 --threads 16 --timeout 0"
     volumes:
-      - "{repo_host}:/repo:rw"
-      - "{show_host}:/repo_show:rw"
-      - "{quarantine_host}:/repo_quarantine:rw"
+      - "$repo_host:/repo:rw"
+      - "$show_host:/repo_show:rw"
+      - "$quarantine_host:/repo_quarantine:rw"
       - "./config:/config:rw"
 """
 
+# Parsed once at import; generate() only substitutes
+_IMAGE_TPL = Template(COMPOSE_IMAGE_TEMPLATE)
+_BUILD_TPL = Template(COMPOSE_BUILD_TEMPLATE)
+
+
+@lru_cache(maxsize=32)
+def _render(deploy_mode: str, image_ref: str, repo_host: str, show_host: str,
+            quarantine_host: str, sheet_name: str) -> str:
+    """Render a compose file; repeated previews of the same config hit the cache."""
+    template = _IMAGE_TPL if deploy_mode == 'image' else _BUILD_TPL
+    return template.substitute(
+        image_ref=image_ref,
+        repo_host=repo_host,
+        show_host=show_host,
+        quarantine_host=quarantine_host,
+        sheet_name=sheet_name
+    )
+
 
 class ComposeGenerator:
     """Generates docker-compose.yml files for the main FileReporter2 application."""
@@ -91,24 +113,20 @@ class ComposeGenerator:
         if not is_valid:
             return False, "", error_msg
 
-        # Select template based on deploy mode
         deploy_mode = config.get('deploy_mode', 'image')
-        if deploy_mode == 'image':
-            template = COMPOSE_IMAGE_TEMPLATE
-        else:
-            template = COMPOSE_BUILD_TEMPLATE
 
         # Escape sheet name for YAML
         sheet_name = config.get('sheet_name', DEFAULT_SHEET_NAME).replace('"', '\\"')
 
         # Generate compose content
         try:
-            compose_content = template.format(
-                image_ref=config.get('image_ref', 'jspodick/filereporter2:latest'),
-                repo_host=config.get('repo_dir'),
-                show_host=config.get('show_dir'),
-                quarantine_host=config.get('quarantine_dir'),
-                sheet_name=sheet_name
+            compose_content = _render(
+                deploy_mode,
+                str(config.get('image_ref', 'jspodick/filereporter2:latest')),
+                str(config.get('repo_dir')),
+                str(config.get('show_dir')),
+                str(config.get('quarantine_dir')),
+                sheet_name
             )
             return True, compose_content, ""
         except Exception as e:
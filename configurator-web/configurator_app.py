@@ -1,17 +1,36 @@
 """
 FileReporter2 Web Configurator
-Flask application for configuring and managing the FileReporter2 Docker container.
+Quart (async Flask) application for configuring and managing the FileReporter2 Docker container.
+Blocking Docker SDK / CLI / filesystem work runs in worker threads so one event loop
+can serve many concurrent status polls and log streams.
 """
 
 import os
-import json
-from flask import Flask, render_template, request, jsonify, Response
+import asyncio
+import gzip
+import hashlib
+import orjson
+import threading
+import tempfile
+from quart import Quart, render_template, request, jsonify, Response
+from quart.json.provider import DefaultJSONProvider
 from werkzeug.utils import secure_filename
 from compose_generator import ComposeGenerator
 from docker_manager import DockerManager
 from file_browser import FileBrowser
 
-app = Flask(__name__)
+class OrjsonProvider(DefaultJSONProvider):
+    """jsonify() and request.get_json() through orjson."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+app = Quart(__name__)
+app.json = OrjsonProvider(app)
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 
 # Configuration
@@ -20,37 +39,117 @@ CONFIG_PATH = os.environ.get('CONFIG_PATH', '/config')
 SETTINGS_FILE = os.path.join(CONFIG_PATH, 'configurator-settings.json')
 HOST_MOUNT = os.environ.get('HOST_MOUNT', '/host')
 
+# Log lines arriving within this window (or up to this many bytes) go out as one SSE event
+LOG_BATCH_WINDOW = 0.05
+LOG_BATCH_BYTES = 64 * 1024
+SSE_KEEPALIVE = 15  # seconds
+
+# JSON bodies at least this large are gzipped for clients that accept it
+GZIP_MIN_BYTES = 1024
+
 # Initialize components
 compose_gen = ComposeGenerator(workspace_path=WORKSPACE_PATH)
 docker_mgr = DockerManager(compose_file=os.path.join(WORKSPACE_PATH, 'docker-compose.yml'))
 file_browser = FileBrowser(host_root=HOST_MOUNT)
 
 
+@app.after_request
+async def compress_json(response):
+    """Gzip larger JSON responses (log tails, config) when the client accepts it."""
+    if (response.mimetype != 'application/json'
+            or 'Content-Encoding' in response.headers
+            or 'gzip' not in request.headers.get('Accept-Encoding', '')):
+        return response
+    data = await response.get_data()
+    if len(data) < GZIP_MIN_BYTES:
+        return response
+    response.set_data(gzip.compress(data, compresslevel=5))
+    response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
+
+
 # --- Configuration Management ---
 
+# Parsed settings file keyed by its st_mtime_ns; save_config refreshes it directly
+_config_cache = {"mtime": None, "data": None, "etag": None}
+
+
 def load_config():
     """Load configuration from settings file."""
-    if os.path.exists(SETTINGS_FILE):
+    try:
+        mtime = os.stat(SETTINGS_FILE).st_mtime_ns
+    except OSError:
+        return get_default_config()
+    if _config_cache["mtime"] != mtime:
         try:
-            with open(SETTINGS_FILE, 'r') as f:
-                return json.load(f)
+            with open(SETTINGS_FILE, 'rb') as f:
+                data = orjson.loads(f.read())
         except Exception as e:
             print(f"Error loading config: {e}")
             return get_default_config()
-    return get_default_config()
+        _config_cache["mtime"], _config_cache["data"], _config_cache["etag"] = mtime, data, None
+    # Callers update the returned dict, so don't hand out the cached one
+    return dict(_config_cache["data"])
 
 
 def save_config(config):
-    """Save configuration to settings file."""
+    """Save configuration to settings file; a config identical to what's on disk is not rewritten."""
     try:
+        if config == _config_cache["data"]:
+            try:
+                if os.stat(SETTINGS_FILE).st_mtime_ns == _config_cache["mtime"]:
+                    return True, ""
+            except OSError:
+                pass
         os.makedirs(CONFIG_PATH, exist_ok=True)
-        with open(SETTINGS_FILE, 'w') as f:
-            json.dump(config, f, indent=2)
+        with open(SETTINGS_FILE, 'wb') as f:
+            f.write(orjson.dumps(config, option=orjson.OPT_INDENT_2))
+        _config_cache["mtime"], _config_cache["data"], _config_cache["etag"] = os.stat(SETTINGS_FILE).st_mtime_ns, dict(config), None
         return True, ""
     except Exception as e:
         return False, f"Error saving config: {str(e)}"
 
 
+def config_etag(config):
+    """Strong ETag for a config dict, computed once per cached config generation."""
+    if config == _config_cache["data"] and _config_cache["etag"]:
+        return _config_cache["etag"]
+    digest = hashlib.blake2b(orjson.dumps(config, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+    etag = f'"{digest}"'
+    if config == _config_cache["data"]:
+        _config_cache["etag"] = etag
+    return etag
+
+
+def _reserve_upload_path():
+    os.makedirs(CONFIG_PATH, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=CONFIG_PATH, prefix='.sa-upload-', suffix='.json')
+    os.close(fd)
+    return tmp_path
+
+
+def _install_json_file(tmp_path, dest_path):
+    """Move tmp_path over dest_path; raises ValueError (orjson.JSONDecodeError) if it isn't valid JSON."""
+    with open(tmp_path, 'rb') as f:
+        orjson.loads(f.read())
+    os.replace(tmp_path, dest_path)
+
+
+def _discard(path):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _mark_sa_uploaded():
+    config = load_config()
+    if config.get('service_account_uploaded') is not True:
+        config['service_account_uploaded'] = True
+        save_config(config)
+
+
 def get_default_config():
     """Get default configuration."""
     return {
@@ -68,24 +167,28 @@ def get_default_config():
 # --- Routes ---
 
 @app.route('/')
-def index():
+async def index():
     """Main configurator page."""
-    return render_template('configurator.html')
+    return await render_template('configurator.html')
 
 
 @app.route('/api/config', methods=['GET'])
-def get_config():
+async def get_config():
     """Get current configuration."""
-    config = load_config()
-    return jsonify(config)
+    config = await asyncio.to_thread(load_config)
+    etag = config_etag(config)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("If-None-Match") == etag:
+        return "", 304, headers
+    return jsonify(config), 200, headers
 
 
 @app.route('/api/config', methods=['POST'])
-def update_config():
+async def update_config():
     """Save configuration."""
     try:
-        config = request.get_json()
-        success, error = save_config(config)
+        config = await request.get_json()
+        success, error = await asyncio.to_thread(save_config, config)
         if success:
             return jsonify({"success": True, "message": "Configuration saved"})
         else:
@@ -95,16 +198,17 @@ def update_config():
 
 
 @app.route('/api/config/generate', methods=['POST'])
-def generate_compose():
+async def generate_compose():
     """Generate docker-compose.yml file."""
     try:
-        config = request.get_json()
+        config = await request.get_json()
 
-        # Save config first
-        save_config(config)
+        # Save config, then generate the compose file (both disk I/O, off the event loop)
+        def save_and_generate():
+            save_config(config)
+            return compose_gen.write_compose_file(config)
 
-        # Generate compose file
-        success, error = compose_gen.write_compose_file(config)
+        success, error = await asyncio.to_thread(save_and_generate)
 
         if success:
             return jsonify({
@@ -119,38 +223,36 @@ def generate_compose():
 
 
 @app.route('/api/config/upload-sa', methods=['POST'])
-def upload_service_account():
+async def upload_service_account():
     """Upload service account JSON file."""
     try:
-        if 'file' not in request.files:
+        files = await request.files
+        if 'file' not in files:
             return jsonify({"success": False, "error": "No file provided"}), 400
 
-        file = request.files['file']
+        file = files['file']
         if file.filename == '':
             return jsonify({"success": False, "error": "No file selected"}), 400
 
         if not file.filename.endswith('.json'):
             return jsonify({"success": False, "error": "File must be a JSON file"}), 400
 
-        # Validate JSON content
+        # Stream the upload to a temp file next to the destination, validate it
+        # from disk, then swap it in so a bad upload never replaces a good key
+        dest_path = os.path.join(CONFIG_PATH, 'google-service-account.json')
+        tmp_path = await asyncio.to_thread(_reserve_upload_path)
         try:
-            content = file.read()
-            json.loads(content)  # Validate JSON
-            file.seek(0)  # Reset file pointer
-        except json.JSONDecodeError:
+            await file.save(tmp_path)
+            await asyncio.to_thread(_install_json_file, tmp_path, dest_path)
+        except ValueError:
+            await asyncio.to_thread(_discard, tmp_path)
             return jsonify({"success": False, "error": "Invalid JSON file"}), 400
-
-        # Save file
-        os.makedirs(CONFIG_PATH, exist_ok=True)
-        dest_path = os.path.join(CONFIG_PATH, 'google-service-account.json')
-
-        with open(dest_path, 'wb') as f:
-            f.write(content)
+        except Exception:
+            await asyncio.to_thread(_discard, tmp_path)
+            raise
 
         # Update config
-        config = load_config()
-        config['service_account_uploaded'] = True
-        save_config(config)
+        await asyncio.to_thread(_mark_sa_uploaded)
 
         return jsonify({
             "success": True,
@@ -163,36 +265,72 @@ def upload_service_account():
 
 # --- Docker Management ---
 
-@app.route('/api/docker/status', methods=['GET'])
-def docker_status():
-    """Get Docker and container status."""
-    # Check Docker availability
-    docker_available, docker_msg = docker_mgr.check_available()
-    compose_available, compose_type = docker_mgr.check_docker_compose()
+# Replaced (after being set) whenever the status snapshot changes; status streams await it
+_status_changed = asyncio.Event()
+
+
+def _publish_status_change():
+    global _status_changed
+    _status_changed.set()
+    _status_changed = asyncio.Event()
+
+
+@app.before_serving
+async def start_status_watcher():
+    loop = asyncio.get_running_loop()
+    docker_mgr.add_status_listener(lambda _snapshot: loop.call_soon_threadsafe(_publish_status_change))
+    await asyncio.to_thread(docker_mgr.start_status_watcher)
 
-    # Get container status
-    container_status = docker_mgr.get_status()
 
-    return jsonify({
-        "docker_available": docker_available,
-        "docker_message": docker_msg,
+def status_payload():
+    compose_available, compose_type = docker_mgr.check_docker_compose()
+    snapshot = docker_mgr.get_status_snapshot()
+    return {
+        "docker_available": snapshot["docker_available"],
+        "docker_message": snapshot["docker_message"],
         "compose_available": compose_available,
         "compose_type": compose_type,
-        "container": container_status
-    })
+        "container": snapshot["container"]
+    }
+
+
+@app.route('/api/docker/status', methods=['GET'])
+async def docker_status():
+    """Get Docker and container status."""
+    return jsonify(await asyncio.to_thread(status_payload))
+
+
+@app.route('/api/docker/status/stream', methods=['GET'])
+async def docker_status_stream():
+    """Push Docker/container status over Server-Sent Events whenever it changes."""
+    async def generate():
+        last = None
+        while True:
+            # Grab the event before reading so a change in between isn't missed
+            changed = _status_changed
+            payload = orjson.dumps(await asyncio.to_thread(status_payload))
+            if payload != last:
+                last = payload
+                yield b"data: " + payload + b"\n\n"
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=SSE_KEEPALIVE)
+            except asyncio.TimeoutError:
+                yield b":\n\n"
+
+    return Response(generate(), mimetype='text/event-stream')
 
 
 @app.route('/api/docker/pull', methods=['POST'])
-def docker_pull():
+async def docker_pull():
     """Pull Docker image."""
     try:
-        data = request.get_json()
+        data = await request.get_json()
         image_ref = data.get('image_ref')
 
         if not image_ref:
             return jsonify({"success": False, "error": "No image reference provided"}), 400
 
-        success, message = docker_mgr.pull_image(image_ref)
+        success, message = await asyncio.to_thread(docker_mgr.pull_image, image_ref)
 
         if success:
             return jsonify({"success": True, "message": message})
@@ -204,13 +342,13 @@ def docker_pull():
 
 
 @app.route('/api/docker/up', methods=['POST'])
-def docker_up():
+async def docker_up():
     """Start the main application container."""
     try:
-        data = request.get_json()
+        data = await request.get_json()
         build = data.get('build', False)
 
-        success, message = docker_mgr.compose_up(build=build)
+        success, message = await asyncio.to_thread(docker_mgr.compose_up, build=build)
 
         if success:
             return jsonify({"success": True, "message": message})
@@ -222,10 +360,10 @@ def docker_up():
 
 
 @app.route('/api/docker/down', methods=['POST'])
-def docker_down():
+async def docker_down():
     """Stop the main application container."""
     try:
-        success, message = docker_mgr.compose_down()
+        success, message = await asyncio.to_thread(docker_mgr.compose_down)
 
         if success:
             return jsonify({"success": True, "message": message})
@@ -237,10 +375,10 @@ def docker_down():
 
 
 @app.route('/api/docker/restart', methods=['POST'])
-def docker_restart():
+async def docker_restart():
     """Restart the main application container."""
     try:
-        success, message = docker_mgr.compose_restart()
+        success, message = await asyncio.to_thread(docker_mgr.compose_restart)
 
         if success:
             return jsonify({"success": True, "message": message})
@@ -252,24 +390,74 @@ def docker_restart():
 
 
 @app.route('/api/docker/logs/stream', methods=['GET'])
-def docker_logs_stream():
-    """Stream Docker logs using Server-Sent Events."""
-    def generate():
+async def docker_logs_stream():
+    """Stream Docker logs using Server-Sent Events, batching lines into multi-line events."""
+    loop = asyncio.get_running_loop()
+    lines = asyncio.Queue()
+    stop = threading.Event()
+
+    def push(item):
+        try:
+            loop.call_soon_threadsafe(lines.put_nowait, item)
+        except RuntimeError:
+            # Event loop is gone (client disconnected during shutdown)
+            stop.set()
+
+    def pump():
+        # docker-py's log iterator blocks, so it runs on its own thread
         try:
             for line in docker_mgr.stream_logs(tail=200):
-                yield f"data: {line}\n\n"
+                if stop.is_set():
+                    break
+                push(line)
         except Exception as e:
-            yield f"data: Error streaming logs: {str(e)}\n\n"
+            push(f"Error streaming logs: {str(e)}")
+        finally:
+            push(None)
+
+    async def generate():
+        threading.Thread(target=pump, daemon=True).start()
+        try:
+            done = False
+            while not done:
+                try:
+                    line = await asyncio.wait_for(lines.get(), timeout=SSE_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ":\n\n"
+                    continue
+                if line is None:
+                    break
+
+                batch, size = [line], len(line)
+                deadline = loop.time() + LOG_BATCH_WINDOW
+                while size < LOG_BATCH_BYTES:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        line = await asyncio.wait_for(lines.get(), timeout=remaining)
+                    except asyncio.TimeoutError:
+                        break
+                    if line is None:
+                        done = True
+                        break
+                    batch.append(line)
+                    size += len(line)
+
+                # One data: field per line; the browser rejoins them with newlines
+                yield "".join(f"data: {l}\n" for l in batch) + "\n"
+        finally:
+            stop.set()
 
     return Response(generate(), mimetype='text/event-stream')
 
 
 @app.route('/api/docker/logs', methods=['GET'])
-def docker_logs():
+async def docker_logs():
     """Get recent Docker logs (non-streaming)."""
     try:
         tail = request.args.get('tail', 200, type=int)
-        logs = docker_mgr.get_logs(tail=tail)
+        logs = await asyncio.to_thread(docker_mgr.get_logs, tail=tail)
         return jsonify({"success": True, "logs": logs})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
@@ -278,16 +466,16 @@ def docker_logs():
 # --- Path Validation ---
 
 @app.route('/api/validate-path', methods=['POST'])
-def validate_path():
+async def validate_path():
     """Validate that a path exists and is accessible."""
     try:
-        data = request.get_json()
+        data = await request.get_json()
         path = data.get('path')
 
         if not path:
             return jsonify({"valid": False, "error": "No path provided"}), 400
 
-        is_valid, error_msg = file_browser.validate_path(path)
+        is_valid, error_msg = await asyncio.to_thread(file_browser.validate_path, path)
 
         return jsonify({
             "valid": is_valid,
@@ -301,7 +489,7 @@ def validate_path():
 # --- Health Check ---
 
 @app.route('/api/health', methods=['GET'])
-def health():
+async def health():
     """Health check endpoint."""
     return jsonify({"status": "ok"})
 
@@ -310,5 +498,5 @@ if __name__ == '__main__':
     # Ensure config directory exists
     os.makedirs(CONFIG_PATH, exist_ok=True)
 
-    # Run Flask app
+    # Development server; the container runs hypercorn (see Dockerfile)
     app.run(host='0.0.0.0', port=8009, debug=True)
@@ -6,9 +6,21 @@ Uses docker-py SDK for better control than subprocess calls.
 import docker
 import subprocess
 import os
-from typing import Generator, Optional
+import re
+import threading
+from typing import Callable, Generator, Optional
 import time
 
+# Max docker compose CLI processes running at once; further requests are rejected
+CLI_WORKERS = 2
+CLI_BUSY_MESSAGE = "Another docker compose operation is in progress; try again shortly"
+
+
+def compose_project_name(compose_dir: str) -> str:
+    """The project name `docker compose` derives for a directory (labels its containers)."""
+    name = os.environ.get("COMPOSE_PROJECT_NAME") or os.path.basename(os.path.abspath(compose_dir))
+    return re.sub(r"[^a-z0-9_-]", "", name.lower())
+
 
 class DockerManager:
     """Manages Docker operations for the FileReporter2 main application."""
@@ -17,6 +29,11 @@ class DockerManager:
         self.compose_file = compose_file
         self.service_name = service_name
         self.compose_dir = os.path.dirname(compose_file)
+        # Only this project's service: another compose project may have a "media" service too
+        self.container_labels = [
+            f"com.docker.compose.project={compose_project_name(self.compose_dir)}",
+            f"com.docker.compose.service={service_name}",
+        ]
 
         try:
             self.client = docker.from_env()
@@ -24,6 +41,21 @@ class DockerManager:
             self.client = None
             print(f"Warning: Could not connect to Docker: {e}")
 
+        # Which compose CLI is installed doesn't change while we run; probe once
+        self._compose_available, self._compose_type = self._probe_compose()
+
+        # At most CLI_WORKERS compose CLI processes at once, so a burst of clicks can't fork-bomb the host
+        self._cli_slots = threading.BoundedSemaphore(CLI_WORKERS)
+
+        # Status snapshot kept current by the Docker events watcher (see start_status_watcher)
+        self._status_lock = threading.Lock()
+        self._status_snapshot = None
+        self._status_listeners = []
+        self._watcher = None
+
+        # ID of the service's container from the last lookup; reused until it disappears
+        self._container_id = None
+
     def check_available(self) -> tuple[bool, str]:
         """
         Check if Docker daemon is available.
@@ -40,9 +72,17 @@ class DockerManager:
 
     def check_docker_compose(self) -> tuple[bool, str]:
         """
-        Check if docker compose command is available.
+        Check if docker compose command is available (cached probe result).
         Returns (is_available, command_type).
         """
+        return self._compose_available, self._compose_type
+
+    def refresh_compose_probe(self) -> tuple[bool, str]:
+        """Re-run the compose CLI probe, e.g. after installing Docker Compose."""
+        self._compose_available, self._compose_type = self._probe_compose()
+        return self._compose_available, self._compose_type
+
+    def _probe_compose(self) -> tuple[bool, str]:
         # Try docker compose plugin first
         try:
             result = subprocess.run(
@@ -74,6 +114,9 @@ class DockerManager:
     def get_compose_cmd(self) -> Optional[list]:
         """Get the docker compose command (either 'docker compose' or 'docker-compose')."""
         is_available, cmd_type = self.check_docker_compose()
+        if not is_available:
+            # Only user actions get here, so it's cheap to look again in case compose was installed since startup
+            is_available, cmd_type = self.refresh_compose_probe()
         if not is_available:
             return None
 
@@ -82,6 +125,47 @@ class DockerManager:
         else:
             return ["docker-compose"]
 
+    def _run_cli(self, cmd: list, timeout: int) -> Optional[subprocess.CompletedProcess]:
+        """
+        Run a compose CLI command in the calling thread, holding one of the CLI_WORKERS slots.
+        Returns None without running anything if every slot is taken.
+        """
+        if not self._cli_slots.acquire(blocking=False):
+            return None
+        try:
+            return subprocess.run(
+                cmd,
+                cwd=self.compose_dir,
+                capture_output=True,
+                text=True,
+                timeout=timeout
+            )
+        finally:
+            self._cli_slots.release()
+
+    def _resolve_container(self):
+        """
+        Return the service's container, or None if there isn't one.
+        Reuses the cached ID (a single inspect) and only falls back to the
+        label-filtered list when that container no longer exists.
+        """
+        if self._container_id is not None:
+            try:
+                return self.client.containers.get(self._container_id)
+            except docker.errors.NotFound:
+                self._container_id = None
+
+        containers = self.client.containers.list(
+            filters={"label": self.container_labels}
+        )
+        if not containers:
+            return None
+        self._container_id = containers[0].id
+        return containers[0]
+
+    def _forget_container(self):
+        self._container_id = None
+
     def get_status(self) -> dict:
         """
         Get status of the main app container.
@@ -95,13 +179,9 @@ class DockerManager:
             }
 
         try:
-            # Look for container with the service name label
-            containers = self.client.containers.list(
-                filters={"label": f"com.docker.compose.service={self.service_name}"}
-            )
+            container = self._resolve_container()
 
-            if containers:
-                container = containers[0]
+            if container is not None:
                 return {
                     "running": container.status == "running",
                     "container_id": container.short_id,
@@ -120,6 +200,60 @@ class DockerManager:
                 "status_text": f"Error checking status: {str(e)}"
             }
 
+    def start_status_watcher(self):
+        """
+        Follow the Docker events stream for this service's containers and keep
+        a status snapshot current, so status reads don't each query the daemon.
+        """
+        if self.client is None or self._watcher is not None:
+            return
+        self.refresh_status_snapshot()
+        self._watcher = threading.Thread(target=self._watch_events, daemon=True)
+        self._watcher.start()
+
+    def add_status_listener(self, callback: Callable[[dict], None]):
+        """Register callback(snapshot), called from the watcher thread whenever the snapshot changes."""
+        self._status_listeners.append(callback)
+
+    def refresh_status_snapshot(self) -> dict:
+        """Query the daemon and publish the result if it differs from the current snapshot."""
+        docker_available, docker_message = self.check_available()
+        snapshot = {
+            "docker_available": docker_available,
+            "docker_message": docker_message,
+            "container": self.get_status()
+        }
+        with self._status_lock:
+            changed = snapshot != self._status_snapshot
+            self._status_snapshot = snapshot
+        if changed:
+            for callback in self._status_listeners:
+                try:
+                    callback(snapshot)
+                except Exception as e:
+                    print(f"Status listener failed: {e}")
+        return snapshot
+
+    def get_status_snapshot(self) -> dict:
+        """Latest status snapshot; queries the daemon directly if the watcher isn't running."""
+        with self._status_lock:
+            snapshot = self._status_snapshot
+        if snapshot is None or self._watcher is None:
+            snapshot = self.refresh_status_snapshot()
+        return snapshot
+
+    def _watch_events(self):
+        filters = {"type": "container", "label": self.container_labels}
+        while True:
+            try:
+                for _event in self.client.events(decode=True, filters=filters):
+                    self.refresh_status_snapshot()
+            except Exception as e:
+                print(f"Docker events stream interrupted: {e}")
+            # Reconnect, and catch up on anything missed while disconnected
+            time.sleep(5)
+            self.refresh_status_snapshot()
+
     def pull_image(self, image_ref: str) -> tuple[bool, str]:
         """
         Pull a Docker image.
@@ -154,14 +288,10 @@ class DockerManager:
             cmd.append("--build")
 
         try:
-            result = subprocess.run(
-                cmd,
-                cwd=self.compose_dir,
-                capture_output=True,
-                text=True,
-                timeout=300  # 5 minute timeout for building
-            )
+            result = self._run_cli(cmd, timeout=300)  # 5 minute timeout for building
 
+            if result is None:
+                return False, CLI_BUSY_MESSAGE
             if result.returncode == 0:
                 return True, "Container started successfully"
             else:
@@ -182,16 +312,13 @@ class DockerManager:
             return False, "docker compose not available"
 
         cmd = compose_cmd + ["down"]
+        self._forget_container()
 
         try:
-            result = subprocess.run(
-                cmd,
-                cwd=self.compose_dir,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
+            result = self._run_cli(cmd, timeout=60)
 
+            if result is None:
+                return False, CLI_BUSY_MESSAGE
             if result.returncode == 0:
                 return True, "Container stopped successfully"
             else:
@@ -202,9 +329,23 @@ class DockerManager:
 
     def compose_restart(self) -> tuple[bool, str]:
         """
-        Restart containers using docker compose restart.
+        Restart the service's containers through the Engine API, falling back
+        to docker compose restart if the SDK path is unavailable or fails.
         Returns (success, message).
         """
+        self._forget_container()
+        if self.client is not None:
+            try:
+                containers = self.client.containers.list(
+                    filters={"label": self.container_labels}
+                )
+                if containers:
+                    for container in containers:
+                        container.restart(timeout=10)
+                    return True, "Container restarted successfully"
+            except Exception as e:
+                print(f"SDK restart failed, falling back to docker compose: {e}")
+
         compose_cmd = self.get_compose_cmd()
         if not compose_cmd:
             return False, "docker compose not available"
@@ -212,14 +353,10 @@ class DockerManager:
         cmd = compose_cmd + ["restart"]
 
         try:
-            result = subprocess.run(
-                cmd,
-                cwd=self.compose_dir,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
+            result = self._run_cli(cmd, timeout=60)
 
+            if result is None:
+                return False, CLI_BUSY_MESSAGE
             if result.returncode == 0:
                 return True, "Container restarted successfully"
             else:
@@ -240,23 +377,26 @@ class DockerManager:
             return
 
         try:
-            containers = self.client.containers.list(
-                filters={"label": f"com.docker.compose.service={self.service_name}"}
-            )
+            container = self._resolve_container()
 
-            if not containers:
+            if container is None:
                 yield "No container found to stream logs from"
                 return
 
-            container = containers[0]
-
-            # Stream logs
-            for line in container.logs(stream=True, follow=True, tail=tail):
-                try:
-                    decoded_line = line.decode('utf-8').rstrip('\n')
-                    yield decoded_line
-                except Exception as e:
-                    yield f"Error decoding log line: {str(e)}"
+            # docker-py yields one chunk per log frame, which may hold several lines or
+            # end mid-line (and mid UTF-8 sequence). Reassemble into one buffer and
+            # decode each completed run of lines once.
+            pending = bytearray()
+            for chunk in container.logs(stream=True, follow=True, tail=tail):
+                pending += chunk
+                end = pending.rfind(b"\n")
+                if end < 0:
+                    continue
+                text = pending[:end].decode('utf-8', errors='replace')
+                del pending[:end + 1]
+                yield from text.split('\n')
+            if pending:
+                yield pending.decode('utf-8', errors='replace')
 
         except Exception as e:
             yield f"Error streaming logs: {str(e)}"
@@ -272,15 +412,15 @@ class DockerManager:
             return "Error: Docker not available"
 
         try:
-            containers = self.client.containers.list(
-                filters={"label": f"com.docker.compose.service={self.service_name}"}
-            )
+            container = self._resolve_container()
 
-            if not containers:
+            if container is None:
                 return "No container found"
-
-            container = containers[0]
-            logs = container.logs(tail=tail).decode('utf-8')
-            return logs
+            # Collect the frames into one buffer and decode once, rather than
+            # letting docker-py concatenate the demultiplexed body bytes-by-bytes
+            buf = bytearray()
+            for chunk in container.logs(stream=True, follow=False, tail=tail):
+                buf += chunk
+            return buf.decode('utf-8', errors='replace')
         except Exception as e:
             return f"Error retrieving logs: {str(e)}"
@@ -4,6 +4,27 @@ Validates that paths exist and are accessible on the host.
 """
 
 import os
+import posixpath
+
+
+def _make_host_path_mapper(host_root: str):
+    """
+    Build the host -> container path converter for one mount root.
+    The root and its prefix are bound as closure constants, so each
+    call is straight-line string work with no attribute lookups.
+    """
+    root = os.path.abspath(host_root).rstrip('/') or '/'
+    prefix = root.rstrip('/') + '/'
+    normpath = posixpath.normpath
+
+    def host_path_to_path(host_path: str) -> str:
+        """Host path (/Users/name) -> path inside this container (/host/Users/name)."""
+        normalized = normpath('/' + (host_path or '/').replace('\\', '/').lstrip('/'))
+        if normalized == '/':
+            return root
+        return prefix + normalized[1:]
+
+    return host_path_to_path
 
 
 class FileBrowser:
@@ -16,6 +37,8 @@ class FileBrowser:
             host_root: Mount point for host filesystem in container
         """
         self.host_root = host_root
+        # Specialized for this root once; every validate call maps paths through it
+        self.host_path_to_path = _make_host_path_mapper(host_root)
 
     def validate_path(self, host_path: str) -> tuple[bool, str]:
         """
@@ -27,9 +50,8 @@ class FileBrowser:
         Returns:
             (is_valid, error_message)
         """
-        # Convert host path to container path
         # Host path: /Users/name/Documents -> Container path: /host/Users/name/Documents
-        container_path = os.path.join(self.host_root, host_path.lstrip('/\\'))
+        container_path = self.host_path_to_path(host_path)
 
         if not os.path.exists(container_path):
             return False, f"Path does not exist"
@@ -237,48 +237,55 @@ function openMainApp() {
 async function refreshStatus() {
     try {
         const response = await fetch('/api/docker/status');
-        const status = await response.json();
-
-        let statusText = '';
-        let statusClass = '';
-
-        if (!status.docker_available) {
-            statusText = 'Docker Not Available';
-            statusClass = 'status-error';
-        } else if (!status.compose_available) {
-            statusText = 'Docker Compose Not Available';
-            statusClass = 'status-error';
-        } else if (status.container.running) {
-            statusText = 'Running';
-            statusClass = 'status-running';
-        } else {
-            statusText = 'Stopped';
-            statusClass = 'status-stopped';
-        }
-
-        const statusBadge = document.getElementById('containerStatus');
-        statusBadge.textContent = statusText;
-        statusBadge.className = 'status-badge ' + statusClass;
+        renderStatus(await response.json());
+    } catch (error) {
+        console.error('Error refreshing status:', error);
+    }
+}
 
-        const statusTextElem = document.getElementById('statusText');
-        if (status.docker_available && status.compose_available) {
-            statusTextElem.textContent = status.container.status_text;
-        } else {
-            statusTextElem.textContent = status.docker_message;
-        }
+function renderStatus(status) {
+    let statusText = '';
+    let statusClass = '';
+
+    if (!status.docker_available) {
+        statusText = 'Docker Not Available';
+        statusClass = 'status-error';
+    } else if (!status.compose_available) {
+        statusText = 'Docker Compose Not Available';
+        statusClass = 'status-error';
+    } else if (status.container.running) {
+        statusText = 'Running';
+        statusClass = 'status-running';
+    } else {
+        statusText = 'Stopped';
+        statusClass = 'status-stopped';
+    }
 
-        // Enable/disable buttons based on status
-        document.getElementById('btnStart').disabled = !status.compose_available;
-        document.getElementById('btnStop').disabled = !status.compose_available;
-        document.getElementById('btnRestart').disabled = !status.compose_available;
-        document.getElementById('btnOpenApp').disabled = !status.container.running;
+    const statusBadge = document.getElementById('containerStatus');
+    statusBadge.textContent = statusText;
+    statusBadge.className = 'status-badge ' + statusClass;
 
-    } catch (error) {
-        console.error('Error refreshing status:', error);
+    const statusTextElem = document.getElementById('statusText');
+    if (status.docker_available && status.compose_available) {
+        statusTextElem.textContent = status.container.status_text;
+    } else {
+        statusTextElem.textContent = status.docker_message;
     }
+
+    // Enable/disable buttons based on status
+    document.getElementById('btnStart').disabled = !status.compose_available;
+    document.getElementById('btnStop').disabled = !status.compose_available;
+    document.getElementById('btnRestart').disabled = !status.compose_available;
+    document.getElementById('btnOpenApp').disabled = !status.container.running;
 }
 
 function startStatusPolling() {
+    // The server pushes status whenever Docker reports a change to the container
+    if (window.EventSource) {
+        const source = new EventSource('/api/docker/status/stream');
+        source.onmessage = (event) => renderStatus(JSON.parse(event.data));
+        return;
+    }
     // Poll every 5 seconds
     statusPollInterval = setInterval(refreshStatus, 5000);
 }
@@ -295,7 +302,8 @@ function startLogStream() {
     logStreamSource = new EventSource('/api/docker/logs/stream');
 
     logStreamSource.onmessage = function(event) {
-        log(event.data);
+        // The server batches several log lines into one event
+        event.data.split('\n').forEach(log);
     };
 
     logStreamSource.onerror = function(error) {
@@ -4,14 +4,25 @@ Modern, dark-themed configurator with native file dialogs
 """
 
 import os
-import sys
+import atexit
 import subprocess
-import json
-import webbrowser
 import threading
+import queue
+import selectors
+import signal
 import time
+import collections
+import re
+import shutil
+from functools import lru_cache
+from string import Template
 import customtkinter as ctk
-from tkinter import filedialog, messagebox
+
+try:
+    # Optional: status checks go straight to the Engine API over its socket/pipe instead of forking the CLI
+    import docker
+except ImportError:
+    docker = None
 
 # Set appearance mode and default color theme
 ctk.set_appearance_mode("dark")
@@ -23,14 +34,19 @@ def _win_si():
         return None, 0
     si = subprocess.STARTUPINFO()
     si.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-    flags = subprocess.CREATE_NO_WINDOW
+    # Own process group, so stop_logs can signal the docker CLI and its children together
+    flags = subprocess.CREATE_NO_WINDOW | subprocess.CREATE_NEW_PROCESS_GROUP
     return si, flags
 
+# subprocess.DEVNULL opens the null device on every spawn; open it once and share the fd
+_DEVNULL_FD = os.open(os.devnull, os.O_RDWR)
+atexit.register(os.close, _DEVNULL_FD)
+
 def run_quiet(cmd, cwd=None):
     si, flags = _win_si()
     return subprocess.run(
         cmd, cwd=cwd,
-        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        stdout=_DEVNULL_FD, stderr=_DEVNULL_FD,
         text=True,
         startupinfo=si, creationflags=flags
     ).returncode
@@ -45,19 +61,135 @@ def run_capture(cmd, cwd=None):
     )
     return p.returncode, p.stdout
 
-def run_stream_quiet(cmd, cwd=None, on_line=None):
+STREAM_READ_SIZE = 65536
+STREAM_FLUSH_SEC = 0.05
+
+class _LineBatcher:
+    """
+    Turns raw pipe output into batches of lines for on_lines(list_of_lines):
+    whatever was read once the pipe runs dry, or every STREAM_FLUSH_SEC while
+    output keeps arriving.
+    """
+
+    def __init__(self, on_lines):
+        self.on_lines = on_lines
+        self.pending = bytearray()
+        self.batch = []
+        self.last_flush = time.monotonic()
+
+    def feed(self, chunk):
+        self.pending += chunk
+        end = self.pending.rfind(b"\n")
+        if end >= 0:
+            text = self.pending[:end].decode("utf-8", errors="replace").replace("\r\n", "\n")
+            del self.pending[:end + 1]
+            self.batch.extend(text.split("\n"))
+        # A short read means the pipe is drained, so flush now rather than wait for more output
+        if len(chunk) < STREAM_READ_SIZE or time.monotonic() - self.last_flush >= STREAM_FLUSH_SEC:
+            self.flush()
+
+    def flush(self):
+        if self.batch:
+            if self.on_lines: self.on_lines(self.batch)
+            self.batch = []
+        self.last_flush = time.monotonic()
+
+    def close(self, returncode):
+        if self.pending:
+            self.batch.append(self.pending.decode("utf-8", errors="replace").rstrip("\r"))
+            self.pending.clear()
+        self.batch.append(f"[process exited {returncode}]")
+        self.flush()
+
+
+class _PipeReader:
+    """
+    One background thread that services the stdout of every streamed subprocess
+    with a selector, so repeated View Logs clicks don't each leave a pump thread.
+    Windows can't select() on pipes; there run_stream_quiet falls back to a thread per stream.
+    """
+
+    def __init__(self):
+        self._sel = selectors.DefaultSelector()
+        self._requests = queue.SimpleQueue()
+        # Registration happens on the reader thread; a byte on this pipe wakes its select()
+        self._wake_r, self._wake_w = os.pipe()
+        self._sel.register(self._wake_r, selectors.EVENT_READ, None)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def register(self, proc, on_lines):
+        self._requests.put(("add", proc, _LineBatcher(on_lines)))
+        os.write(self._wake_w, b"\0")
+
+    def unregister(self, proc):
+        """Stop delivering output for proc (its remaining output is discarded)."""
+        self._requests.put(("remove", proc, None))
+        os.write(self._wake_w, b"\0")
+
+    def _drop(self, proc):
+        try:
+            self._sel.unregister(proc.stdout)
+        except (KeyError, ValueError):
+            return False
+        proc.stdout.close()
+        return True
+
+    def _run(self):
+        while True:
+            for key, _ in self._sel.select(timeout=STREAM_FLUSH_SEC):
+                if key.data is None:
+                    os.read(self._wake_r, 4096)
+                    continue
+                proc, batcher = key.data
+                chunk = os.read(key.fd, STREAM_READ_SIZE)
+                if chunk:
+                    batcher.feed(chunk)
+                    continue
+                self._drop(proc)
+                try:
+                    returncode = proc.wait(timeout=1)
+                except subprocess.TimeoutExpired:
+                    returncode = None
+                batcher.close(returncode)
+            while not self._requests.empty():
+                action, proc, batcher = self._requests.get()
+                if action == "add":
+                    self._sel.register(proc.stdout, selectors.EVENT_READ, (proc, batcher))
+                else:
+                    self._drop(proc)
+            for key in list(self._sel.get_map().values()):
+                if key.data is not None and key.data[1].batch:
+                    if time.monotonic() - key.data[1].last_flush >= STREAM_FLUSH_SEC:
+                        key.data[1].flush()
+
+
+def run_stream_quiet(cmd, cwd=None, on_lines=None, reader=None):
+    """
+    Start cmd and deliver its combined output to on_lines in batches (see _LineBatcher).
+    Output is pumped by reader (a shared _PipeReader) where pipes can be selected,
+    otherwise by a dedicated daemon thread.
+    """
     si, flags = _win_si()
     p = subprocess.Popen(
         cmd, cwd=cwd,
         stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
-        text=True, bufsize=1,
+        bufsize=0,
         startupinfo=si, creationflags=flags
     )
+    if reader is not None:
+        reader.register(p, on_lines)
+        return p
+
     def pump():
-        for line in p.stdout:
-            if on_line: on_line(line.rstrip("\n"))
-        p.wait()
-        if on_line: on_line(f"[process exited {p.returncode}]")
+        batcher = _LineBatcher(on_lines)
+        fd = p.stdout.fileno()
+        while True:
+            chunk = os.read(fd, STREAM_READ_SIZE)
+            if not chunk:
+                break
+            batcher.feed(chunk)
+        batcher.close(p.wait())
     t = threading.Thread(target=pump, daemon=True)
     t.start()
     return p
@@ -66,9 +198,18 @@ def run_stream_quiet(cmd, cwd=None, on_line=None):
 APP_SERVICE_NAME = "media"
 DEFAULT_SHEET_NAME = "Media Repo Inventory"
 
+# Container status is polled this often, and never queried twice within STATUS_MIN_INTERVAL
+STATUS_POLL_SEC = 5.0
+STATUS_MIN_INTERVAL = 1.5
+
+# Console keeps only the most recent lines so long log follows stay fast
+CONSOLE_MAX_LINES = 5000
+# Buffered console text is written to the widget at most this often
+CONSOLE_FLUSH_MS = 100
+
 COMPOSE_IMAGE = """services:
   media:
-    image: {image_ref}
+    image: $image_ref
     ports:
       - "8008:8008"
     environment:
@@ -77,11 +218,12 @@ COMPOSE_IMAGE = """services:
       QUARANTINE_DIR: /repo_quarantine
       CONFIG_DIR: /config
       GOOGLE_SERVICE_ACCOUNT_JSON: /config/google-service-account.json
-      GOOGLE_SHEET_NAME: {sheet_name}
+      GOOGLE_SHEET_NAME: $sheet_name
+      GUNICORN_CMD_ARGS: "--worker-class gthread --workers 1 --threads 16 --timeout 0"
     volumes:
-      - "{repo_host}:/repo:rw"
-      - "{show_host}:/repo_show:rw"
-      - "{quarantine_host}:/repo_quarantine:rw"
+      - "$repo_host:/repo:rw"
+      - "$show_host:/repo_show:rw"
+      - "$quarantine_host:/repo_quarantine:rw"
       - "./config:/config:rw"
 """
 
@@ -96,20 +238,52 @@ COMPOSE_BUILD = """services:
       QUARANTINE_DIR: /repo_quarantine
       CONFIG_DIR: /config
       GOOGLE_SERVICE_ACCOUNT_JSON: /config/google-service-account.json
-      GOOGLE_SHEET_NAME: {sheet_name}
+      GOOGLE_SHEET_NAME: $sheet_name
+      GUNICORN_CMD_ARGS: "--worker-class gthread --workers 1 --threads 16 --timeout 0"
     volumes:
-      - "{repo_host}:/repo:rw"
-      - "{show_host}:/repo_show:rw"
-      - "{quarantine_host}:/repo_quarantine:rw"
+      - "$repo_host:/repo:rw"
+      - "$show_host:/repo_show:rw"
+      - "$quarantine_host:/repo_quarantine:rw"
       - "./config:/config:rw"
 """
 
+# Parsed once at import; write_compose only substitutes
+_IMAGE_TPL = Template(COMPOSE_IMAGE)
+_BUILD_TPL = Template(COMPOSE_BUILD)
+
+@lru_cache(maxsize=8)
+def render_compose(mode, image_ref, repo_host, show_host, quarantine_host, sheet_name):
+    """Render a compose file; repeated writes of the same form values hit the cache."""
+    template = _IMAGE_TPL if mode == "image" else _BUILD_TPL
+    return template.substitute(
+        image_ref=image_ref,
+        repo_host=repo_host,
+        show_host=show_host,
+        quarantine_host=quarantine_host,
+        sheet_name=sheet_name
+    )
+
+# isdir results are reused for up to ISDIR_TTL seconds (paths may sit on slow network shares)
+ISDIR_TTL = 2.0
+
+@lru_cache(maxsize=64)
+def _isdir_cached(path, epoch):
+    return os.path.isdir(path)
+
+def isdir_cached(path):
+    return _isdir_cached(path, int(time.monotonic() / ISDIR_TTL))
+
 def which(cmd):
-    from shutil import which as w
-    return w(cmd)
+    return shutil.which(cmd)
+
+def compose_project_name(cwd):
+    """The project name `docker compose` derives for a directory (labels its containers)."""
+    name = os.environ.get("COMPOSE_PROJECT_NAME") or os.path.basename(os.path.abspath(cwd))
+    return re.sub(r"[^a-z0-9_-]", "", name.lower())
 
 def docker_compose_cmd():
-    if which("docker") and "compose" in subprocess.getoutput("docker --help"):
+    # `docker compose version` exits non-zero without the plugin: no shell, no help text to scan
+    if which("docker") and run_quiet(["docker", "compose", "version", "--short"]) == 0:
         return ["docker", "compose"]
     if which("docker-compose"):
         return ["docker-compose"]
@@ -134,8 +308,19 @@ class Configurator(ctk.CTk):
             "muted": "#999999"
         }
 
+        # Shared fonts; each CTkFont registers a Tcl font, so build each style once
+        self._fonts = {
+            "title": ctk.CTkFont(size=28, weight="bold"),
+            "subtitle": ctk.CTkFont(size=14),
+            "status": ctk.CTkFont(size=12),
+            "section": ctk.CTkFont(size=18, weight="bold"),
+            "label": ctk.CTkFont(size=13),
+            "console": ctk.CTkFont(family="Courier", size=11)
+        }
+
         # Window setup
         self.title("FileReporter2 Configurator")
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
         self.geometry("1000x700")
 
         # Variables
@@ -150,17 +335,33 @@ class Configurator(ctk.CTk):
 
         # Trace variables to update buttons
         for var in [self.repo, self.show, self.quarantine, self.config, self.sheet]:
-            var.trace_add("write", self.update_buttons)
+            var.trace_add("write", self._schedule_update_buttons)
+        self._update_pending = False
+        self._last_ready = None  # ready-state the action buttons were last set for
 
         self.log_proc = None
+        # Shared stdout pump for streamed commands (POSIX); Windows pumps each stream on its own thread
+        self._reader = _PipeReader() if os.name != "nt" else None
+        # docker compose command detected on first use; only "Re-detect Docker" clears it
+        self._compose_cmd = None
+        # Docker SDK client (if the package is installed), created on first status check
+        self._docker_client = None
+        self._docker_client_failed = False
+        # One pending status check at a time; see refresh_status
+        self._status_after_id = None
+        self._status_last_ts = 0.0
+        self._status_running = False
+        self._log_buf = collections.deque()
+        self._log_flush_id = None
 
         # Build UI
         self.create_widgets()
         self.update_buttons()
 
-        # Start status polling
-        self.after(2000, self.refresh_status)
-        self.after(5000, self.status_poll)
+        # Status follows `docker events`; polling is only the fallback when that stream isn't running
+        self._events_proc = None
+        self.start_status_events()
+        self._schedule_status(2.0)
 
     def create_widgets(self):
         # Header
@@ -170,7 +371,7 @@ class Configurator(ctk.CTk):
         title = ctk.CTkLabel(
             header,
             text="FileReporter2 Configurator",
-            font=ctk.CTkFont(size=28, weight="bold"),
+            font=self._fonts["title"],
             text_color=self.colors["gold"]
         )
         title.pack(pady=20)
@@ -178,7 +379,7 @@ class Configurator(ctk.CTk):
         subtitle = ctk.CTkLabel(
             header,
             text="Configure and manage your FileReporter2 Docker container",
-            font=ctk.CTkFont(size=14),
+            font=self._fonts["subtitle"],
             text_color=self.colors["amber"]
         )
         subtitle.pack(pady=(0, 20))
@@ -190,7 +391,7 @@ class Configurator(ctk.CTk):
         self.status_label = ctk.CTkLabel(
             status_frame,
             text="Status: Unknown",
-            font=ctk.CTkFont(size=12),
+            font=self._fonts["status"],
             text_color=self.colors["text"]
         )
         self.status_label.pack(side="left", padx=20, pady=10)
@@ -206,39 +407,21 @@ class Configurator(ctk.CTk):
         section_label = ctk.CTkLabel(
             config_frame,
             text="Directory Configuration",
-            font=ctk.CTkFont(size=18, weight="bold"),
+            font=self._fonts["section"],
             text_color=self.colors["gold"]
         )
         section_label.pack(anchor="w", padx=20, pady=(15, 10))
 
         # Directory inputs
-        self.create_dir_input(config_frame, "Repo Folder (/repo):", self.repo)
-        self.create_dir_input(config_frame, "Show Folder (/repo_show):", self.show)
-        self.create_dir_input(config_frame, "Quarantine Folder (/repo_quarantine):", self.quarantine)
+        self._labeled_entry(config_frame, "Repo Folder (/repo):", self.repo, self.pick_dir)
+        self._labeled_entry(config_frame, "Show Folder (/repo_show):", self.show, self.pick_dir)
+        self._labeled_entry(config_frame, "Quarantine Folder (/repo_quarantine):", self.quarantine, self.pick_dir)
 
         # Service account
-        self.create_file_input(config_frame, "Service Account JSON:", self.sa_json)
+        self._labeled_entry(config_frame, "Service Account JSON:", self.sa_json, self.pick_file)
 
         # Sheet name
-        sheet_frame = ctk.CTkFrame(config_frame, fg_color="transparent")
-        sheet_frame.pack(fill="x", padx=20, pady=10)
-
-        ctk.CTkLabel(
-            sheet_frame,
-            text="Google Sheet Name:",
-            font=ctk.CTkFont(size=13),
-            text_color=self.colors["amber"],
-            width=200,
-            anchor="w"
-        ).pack(side="left", padx=(0, 10))
-
-        ctk.CTkEntry(
-            sheet_frame,
-            textvariable=self.sheet,
-            fg_color=self.colors["bg_dark"],
-            border_color=self.colors["gold"],
-            text_color=self.colors["text"]
-        ).pack(side="left", fill="x", expand=True)
+        self._labeled_entry(config_frame, "Google Sheet Name:", self.sheet)
 
         # Deployment mode
         deploy_frame = ctk.CTkFrame(main_container, fg_color=self.colors["bg_medium"])
@@ -247,7 +430,7 @@ class Configurator(ctk.CTk):
         section_label2 = ctk.CTkLabel(
             deploy_frame,
             text="Deployment Mode",
-            font=ctk.CTkFont(size=18, weight="bold"),
+            font=self._fonts["section"],
             text_color=self.colors["gold"]
         )
         section_label2.pack(anchor="w", padx=20, pady=(15, 10))
@@ -276,25 +459,7 @@ class Configurator(ctk.CTk):
         ).pack(side="left")
 
         # Image reference
-        img_frame = ctk.CTkFrame(deploy_frame, fg_color="transparent")
-        img_frame.pack(fill="x", padx=20, pady=(0, 15))
-
-        ctk.CTkLabel(
-            img_frame,
-            text="Image (repo:tag):",
-            font=ctk.CTkFont(size=13),
-            text_color=self.colors["amber"],
-            width=200,
-            anchor="w"
-        ).pack(side="left", padx=(0, 10))
-
-        ctk.CTkEntry(
-            img_frame,
-            textvariable=self.image_ref,
-            fg_color=self.colors["bg_dark"],
-            border_color=self.colors["gold"],
-            text_color=self.colors["text"]
-        ).pack(side="left", fill="x", expand=True)
+        self._labeled_entry(deploy_frame, "Image (repo:tag):", self.image_ref, pady=(0, 15))
 
         # Action buttons
         btn_frame = ctk.CTkFrame(main_container, fg_color=self.colors["bg_medium"])
@@ -303,7 +468,7 @@ class Configurator(ctk.CTk):
         section_label3 = ctk.CTkLabel(
             btn_frame,
             text="Actions",
-            font=ctk.CTkFont(size=18, weight="bold"),
+            font=self._fonts["section"],
             text_color=self.colors["gold"]
         )
         section_label3.pack(anchor="w", padx=20, pady=(15, 10))
@@ -369,7 +534,7 @@ class Configurator(ctk.CTk):
         self.btn_open = ctk.CTkButton(
             actions2,
             text="Open Web Portal",
-            command=lambda: webbrowser.open("http://localhost:8008"),
+            command=self.open_portal,
             fg_color=self.colors["bg_light"],
             hover_color=self.colors["bg_dark"],
             border_color=self.colors["gold"],
@@ -405,6 +570,18 @@ class Configurator(ctk.CTk):
         )
         self.btn_logs.pack(side="left", padx=5)
 
+        self.btn_redetect = ctk.CTkButton(
+            actions3,
+            text="Re-detect Docker",
+            command=self.redetect_docker,
+            fg_color=self.colors["bg_light"],
+            hover_color=self.colors["bg_dark"],
+            border_color=self.colors["muted"],
+            border_width=1,
+            text_color=self.colors["text"]
+        )
+        self.btn_redetect.pack(side="right", padx=5)
+
         self.btn_stoplogs = ctk.CTkButton(
             actions3,
             text="Stop Logs",
@@ -425,7 +602,7 @@ class Configurator(ctk.CTk):
         console_label = ctk.CTkLabel(
             console_frame,
             text="Console Output",
-            font=ctk.CTkFont(size=18, weight="bold"),
+            font=self._fonts["section"],
             text_color=self.colors["gold"]
         )
         console_label.pack(anchor="w", padx=20, pady=(15, 10))
@@ -434,7 +611,7 @@ class Configurator(ctk.CTk):
             console_frame,
             fg_color="#0a0a0a",
             text_color=self.colors["green"],
-            font=ctk.CTkFont(family="Courier", size=11),
+            font=self._fonts["console"],
             wrap="word"
         )
         self.console.pack(fill="both", expand=True, padx=20, pady=(0, 20))
@@ -443,89 +620,84 @@ class Configurator(ctk.CTk):
         self.log("Tip: Ensure Docker Desktop has access to your selected folders")
         self.log("Populate all fields, write docker-compose.yml, then start the app")
 
-    def create_dir_input(self, parent, label_text, variable):
+    def _labeled_entry(self, parent, label_text, variable, browse_cmd=None, pady=10):
+        """Label + entry row, with a Browse button calling browse_cmd(variable) when given."""
+        colors = self.colors
         frame = ctk.CTkFrame(parent, fg_color="transparent")
-        frame.pack(fill="x", padx=20, pady=10)
+        frame.pack(fill="x", padx=20, pady=pady)
 
-        label = ctk.CTkLabel(
+        ctk.CTkLabel(
             frame,
             text=label_text,
-            font=ctk.CTkFont(size=13),
-            text_color=self.colors["amber"],
+            font=self._fonts["label"],
+            text_color=colors["amber"],
             width=200,
             anchor="w"
-        )
-        label.pack(side="left", padx=(0, 10))
+        ).pack(side="left", padx=(0, 10))
 
         entry = ctk.CTkEntry(
             frame,
             textvariable=variable,
-            fg_color=self.colors["bg_dark"],
-            border_color=self.colors["gold"],
-            text_color=self.colors["text"]
-        )
-        entry.pack(side="left", fill="x", expand=True, padx=(0, 10))
-
-        btn = ctk.CTkButton(
-            frame,
-            text="Browse",
-            command=lambda: self.pick_dir(variable),
-            width=100,
-            fg_color=self.colors["bg_light"],
-            hover_color=self.colors["bg_dark"],
-            border_color=self.colors["gold"],
-            border_width=1,
-            text_color=self.colors["gold"]
-        )
-        btn.pack(side="left")
-
-    def create_file_input(self, parent, label_text, variable):
-        frame = ctk.CTkFrame(parent, fg_color="transparent")
-        frame.pack(fill="x", padx=20, pady=10)
-
-        label = ctk.CTkLabel(
-            frame,
-            text=label_text,
-            font=ctk.CTkFont(size=13),
-            text_color=self.colors["amber"],
-            width=200,
-            anchor="w"
+            fg_color=colors["bg_dark"],
+            border_color=colors["gold"],
+            text_color=colors["text"]
         )
-        label.pack(side="left", padx=(0, 10))
+        if browse_cmd is None:
+            entry.pack(side="left", fill="x", expand=True)
+            return
 
-        entry = ctk.CTkEntry(
-            frame,
-            textvariable=variable,
-            fg_color=self.colors["bg_dark"],
-            border_color=self.colors["gold"],
-            text_color=self.colors["text"]
-        )
         entry.pack(side="left", fill="x", expand=True, padx=(0, 10))
-
-        btn = ctk.CTkButton(
+        ctk.CTkButton(
             frame,
             text="Browse",
-            command=lambda: self.pick_file(variable),
+            command=lambda: browse_cmd(variable),
             width=100,
-            fg_color=self.colors["bg_light"],
-            hover_color=self.colors["bg_dark"],
-            border_color=self.colors["gold"],
+            fg_color=colors["bg_light"],
+            hover_color=colors["bg_dark"],
+            border_color=colors["gold"],
             border_width=1,
-            text_color=self.colors["gold"]
-        )
-        btn.pack(side="left")
+            text_color=colors["gold"]
+        ).pack(side="left")
 
     def log(self, msg):
-        self.console.insert("end", msg + "\n")
+        self._console_write(msg + "\n")
+
+    def _append_lines(self, lines):
+        """Append a batch of streamed lines."""
+        self._console_write("\n".join(lines) + "\n")
+
+    def _console_write(self, text):
+        # Buffer and let _flush_log write everything that arrived in the last CONSOLE_FLUSH_MS
+        # with one insert/see, instead of a Tcl round-trip and redraw per message
+        self._log_buf.append(text)
+        if self._log_flush_id is None:
+            self._log_flush_id = self.after(CONSOLE_FLUSH_MS, self._flush_log)
+
+    def _flush_log(self):
+        self._log_flush_id = None
+        if not self._log_buf:
+            return
+        text = "".join(self._log_buf)
+        self._log_buf.clear()
+        self.console.insert("end", text)
+        line_count = int(self.console.index("end-1c").split(".")[0])
+        if line_count > CONSOLE_MAX_LINES:
+            self.console.delete("1.0", f"{line_count - CONSOLE_MAX_LINES}.0")
         self.console.see("end")
 
+    def open_portal(self):
+        import webbrowser  # only needed on click; keeps it off the startup path
+        webbrowser.open("http://localhost:8008")
+
     def pick_dir(self, var):
+        from tkinter import filedialog
         d = filedialog.askdirectory()
         if d:
             var.set(d)
         self.update_buttons()
 
     def pick_file(self, var):
+        from tkinter import filedialog
         f = filedialog.askopenfilename(filetypes=[("JSON", "*.json"), ("All files", "*.*")])
         if f:
             var.set(f)
@@ -540,8 +712,20 @@ class Configurator(ctk.CTk):
             self.sheet.get().strip(),
         ])
 
+    def _schedule_update_buttons(self, *args):
+        # Every keystroke in any traced field lands here; run update_buttons once per idle turn
+        if self._update_pending:
+            return
+        self._update_pending = True
+        self.after_idle(self.update_buttons)
+
     def update_buttons(self, *args):
+        self._update_pending = False
         ready = self.all_fields_present()
+        # Most edits don't flip readiness; only reconfigure the buttons when it does
+        if ready == self._last_ready:
+            return
+        self._last_ready = ready
         state = "normal" if ready else "disabled"
 
         for btn in [self.btn_write, self.btn_start, self.btn_restart,
@@ -549,12 +733,13 @@ class Configurator(ctk.CTk):
             btn.configure(state=state)
 
     def validate(self):
+        from tkinter import messagebox
         missing = []
         for label, path in [("Repo", self.repo.get()), ("Show", self.show.get()),
                             ("Quarantine", self.quarantine.get()), ("Config", self.config.get())]:
             if not path:
                 missing.append(label)
-            elif not os.path.isdir(path):
+            elif not isdir_cached(path):
                 messagebox.showerror("Invalid Path", f"{label} folder does not exist:\n{path}")
                 return False
         if not self.sheet.get().strip():
@@ -563,22 +748,33 @@ class Configurator(ctk.CTk):
         return True
 
     def write_compose(self):
-        if not self.validate(): return
+        """Render docker-compose.yml; the file is only rewritten when its contents change. Returns False if validation fails."""
+        if not self.validate(): return False
         mode = self.deploy_mode.get()
-        template = COMPOSE_IMAGE if mode == "image" else COMPOSE_BUILD
-        compose_text = template.format(
-            image_ref=self.image_ref.get(),
-            repo_host=self.repo.get(),
-            show_host=self.show.get(),
-            quarantine_host=self.quarantine.get(),
-            config_host=self.config.get(),
-            sheet_name=self.sheet.get().replace('"', '\\"')
+        compose_text = render_compose(
+            mode,
+            self.image_ref.get(),
+            self.repo.get(),
+            self.show.get(),
+            self.quarantine.get(),
+            self.sheet.get().replace('"', '\\"')
         )
+        # Identical content: leave the file (and its mtime) alone
+        try:
+            with open("docker-compose.yml", "r", encoding="utf-8") as f:
+                existing = f.read()
+        except FileNotFoundError:
+            existing = None
+        if existing == compose_text:
+            self.log(f"✅ docker-compose.yml unchanged ({mode} mode)")
+            return True
         with open("docker-compose.yml", "w", encoding="utf-8") as f:
             f.write(compose_text)
         self.log(f"✅ Wrote docker-compose.yml ({mode} mode)")
+        return True
 
     def copy_sa_json(self):
+        from tkinter import messagebox
         src = self.sa_json.get()
         if not src or not os.path.isfile(src):
             messagebox.showerror("Missing JSON", "Pick a valid Service Account JSON file.")
@@ -586,84 +782,200 @@ class Configurator(ctk.CTk):
         os.makedirs(self.config.get(), exist_ok=True)
         dst = os.path.join(self.config.get(), "google-service-account.json")
         try:
-            with open(src, "rb") as s, open(dst, "wb") as d:
-                d.write(s.read())
+            shutil.copyfile(src, dst)
             self.log(f"✅ Copied service account to: {dst}")
         except Exception as e:
             messagebox.showerror("Copy Failed", str(e))
 
     def docker_cmd(self, *args):
-        base = docker_compose_cmd()
+        if self._compose_cmd is None:
+            self._compose_cmd = docker_compose_cmd()
+        base = self._compose_cmd
         if not base:
             self.log("❌ Docker not found on PATH")
             return None
         return list(base) + list(args)
 
+    def docker_client(self):
+        """Shared Docker SDK client, or None if the SDK isn't installed or the daemon is unreachable."""
+        if self._docker_client is None and docker is not None and not self._docker_client_failed:
+            try:
+                self._docker_client = docker.from_env()
+            except Exception:
+                self._docker_client_failed = True
+        return self._docker_client
+
+    def redetect_docker(self):
+        self._docker_client = None
+        self._docker_client_failed = False
+        self._compose_cmd = docker_compose_cmd()
+        if self._compose_cmd:
+            self.log(f"✅ Using {' '.join(self._compose_cmd)}")
+        else:
+            self.log("❌ Docker not found on PATH")
+
+    def _schedule_status(self, delay):
+        """(Re)arm the single pending status check to run after delay seconds."""
+        if self._status_after_id is not None:
+            self.after_cancel(self._status_after_id)
+        self._status_after_id = self.after(int(delay * 1000), self.status_poll)
+
     def refresh_status(self):
-        cmd = self.docker_cmd("ps", "-q")
-        if not cmd: return
-        code, out = run_capture(cmd, cwd=os.getcwd())
-        running = bool(out.strip())
+        # Clicks, post-action refreshes and the poll timer all land here; back-to-back
+        # calls collapse into one `docker compose ps` once the debounce window has passed
+        wait = STATUS_MIN_INTERVAL - (time.monotonic() - self._status_last_ts)
+        if self._status_running or wait > 0:
+            self._schedule_status(max(wait, 0.1))
+            return
+        cwd = os.getcwd()
+        use_sdk = docker is not None and not self._docker_client_failed
+        cmd = None if use_sdk else self.docker_cmd("ps", "-q")
+        if not use_sdk and not cmd:
+            self._apply_status(None)
+            return
+        self._status_running = True
+        # Our app container: this compose project's "media" service, currently running
+        sdk_filters = {
+            "label": [f"com.docker.compose.project={compose_project_name(cwd)}",
+                      f"com.docker.compose.service={APP_SERVICE_NAME}"],
+            "status": "running"
+        }
+
+        # The query can take hundreds of ms (CLI startup, daemon round-trip); keep it off the Tk thread
+        def query():
+            running = None
+            if use_sdk:
+                try:
+                    client = self.docker_client()
+                    if client is not None:
+                        # One HTTP GET on the SDK's persistent connection; the daemon does the filtering
+                        running = bool(client.containers.list(filters=sdk_filters))
+                except Exception:
+                    # from_env() succeeds with the daemon down; the list call is what fails.
+                    # Drop the client so the CLI answers from now on (redetect_docker re-enables the SDK)
+                    self._docker_client = None
+                    self._docker_client_failed = True
+            fallback = cmd
+            if running is None and use_sdk:
+                # SDK couldn't answer: ask the CLI instead (probed here, off the Tk thread)
+                if self._compose_cmd is None:
+                    self._compose_cmd = docker_compose_cmd()
+                fallback = list(self._compose_cmd) + ["ps", "-q"] if self._compose_cmd else None
+            if running is None and fallback:
+                try:
+                    code, out = run_capture(fallback, cwd=cwd)
+                    running = bool(out.strip())
+                except Exception:
+                    running = False
+            if running is None:
+                # Neither the SDK nor the CLI could answer: no reachable daemon, so nothing is running
+                running = False
+            self.after(0, self._apply_status, running)
+        threading.Thread(target=query, daemon=True).start()
+
+    def _apply_status(self, running):
+        """Main-thread half of refresh_status; running is None if the query failed."""
+        self._status_last_ts = time.monotonic()
+        self._status_running = False
+        if self._events_proc is None:
+            self._schedule_status(STATUS_POLL_SEC)
+        if running is None:
+            return
         status_text = "Status: RUNNING ✓" if running else "Status: STOPPED ○"
         self.status_label.configure(
             text=status_text,
             text_color=self.colors["green"] if running else self.colors["red"]
         )
 
-    def status_poll(self):
+    def start_status_events(self):
+        """
+        Follow container lifecycle events for this compose project and refresh status
+        on each one, instead of polling. Returns False if the stream couldn't start.
+        """
+        if not which("docker"):
+            return False
+        project = compose_project_name(os.getcwd())
+        cmd = ["docker", "events",
+               "--filter", "type=container",
+               "--filter", f"label=com.docker.compose.project={project}",
+               "--format", "{{.Status}}"]
         try:
-            self.refresh_status()
-        finally:
-            self.after(5000, self.status_poll)
+            self._events_proc = run_stream_quiet(
+                cmd, on_lines=lambda lines: self.after(0, self._on_status_events), reader=self._reader
+            )
+        except Exception:
+            self._events_proc = None
+            return False
+        return True
+
+    def _on_status_events(self):
+        if self._events_proc is not None and self._events_proc.poll() is not None:
+            self.log("⚠️ docker events stream ended; polling status instead")
+            self._events_proc = None
+        self.refresh_status()
+
+    def status_poll(self):
+        self._status_after_id = None
+        self.refresh_status()
 
     def compose_up(self):
         if not os.path.isfile("docker-compose.yml"):
             self.write_compose()
         cmd_base = self.docker_cmd()
         if not cmd_base:
+            from tkinter import messagebox
             messagebox.showerror("Docker not found", "Need Docker Desktop / docker compose.")
             return
 
-        if self.deploy_mode.get() == "image":
-            pull_cmd = cmd_base + ["pull"]
-            self.log(f"Pulling image...")
-            run_quiet(pull_cmd, cwd=os.getcwd())
-
+        mode = self.deploy_mode.get()
+        cwd = os.getcwd()
         up_cmd = cmd_base + ["up", "-d"]
-        if self.deploy_mode.get() == "build":
+        if mode == "build":
             up_cmd += ["--build"]
 
-        self.log(f"Starting app...")
-        code = run_quiet(up_cmd, cwd=os.getcwd())
+        def work():
+            if mode == "image":
+                self.after(0, self.log, "Pulling image...")
+                run_quiet(cmd_base + ["pull"], cwd=cwd)
+            self.after(0, self.log, "Starting app...")
+            return run_quiet(up_cmd, cwd=cwd)
 
-        if code == 0:
-            self.log("🚀 App started. Open http://localhost:8008")
-        else:
-            self.log("❌ docker compose up failed")
-
-        self.refresh_status()
+        self.run_in_background(work, "🚀 App started. Open http://localhost:8008",
+                               "❌ docker compose up failed")
 
     def compose_down(self):
         cmd = self.docker_cmd("down")
         if not cmd: return
         self.log("Stopping app...")
-        code = run_quiet(cmd, cwd=os.getcwd())
-        if code == 0:
-            self.log("🛑 App stopped")
-        else:
-            self.log("❌ docker compose down failed")
-        self.refresh_status()
+        cwd = os.getcwd()
+        self.run_in_background(lambda: run_quiet(cmd, cwd=cwd),
+                               "🛑 App stopped", "❌ docker compose down failed")
 
     def compose_restart(self):
         cmd = self.docker_cmd("restart")
         if not cmd: return
         self.log("Restarting app...")
-        code = run_quiet(cmd, cwd=os.getcwd())
-        if code == 0:
-            self.log("🔁 App restarted")
-        else:
-            self.log("❌ docker compose restart failed")
-        self.refresh_status()
+        cwd = os.getcwd()
+        self.run_in_background(lambda: run_quiet(cmd, cwd=cwd),
+                               "🔁 App restarted", "❌ docker compose restart failed")
+
+    def run_in_background(self, work, ok_msg, fail_msg):
+        """
+        Run a docker compose action on a worker thread so the window stays responsive.
+        work() returns the exit code; the result is logged and status refreshed on the Tk thread.
+        """
+        def finish(code):
+            self.log(ok_msg if code == 0 else fail_msg)
+            self.refresh_status()
+
+        def runner():
+            try:
+                code = work()
+            except Exception as e:
+                self.after(0, self.log, f"❌ {e}")
+                code = None
+            self.after(0, finish, code)
+        threading.Thread(target=runner, daemon=True).start()
 
     def follow_logs(self):
         if self.log_proc:
@@ -674,20 +986,58 @@ class Configurator(ctk.CTk):
         self.log("Following logs... (click 'Stop Logs' to end)")
         self.btn_logs.configure(state="disabled")
         self.btn_stoplogs.configure(state="normal")
-        def on_line(line): self.log(line)
-        self.log_proc = run_stream_quiet(cmd, cwd=os.getcwd(), on_line=on_line)
+        # Called on the pump thread; hand each batch to the Tk thread
+        def on_lines(lines): self.after(0, self._append_lines, lines)
+        self.log_proc = run_stream_quiet(cmd, cwd=os.getcwd(), on_lines=on_lines, reader=self._reader)
 
     def stop_logs(self):
         if not self.log_proc: return
+        proc = self.log_proc
+        if self._reader is not None:
+            self._reader.unregister(proc)
         try:
-            self.log_proc.terminate()
+            if os.name == "nt":
+                # terminate() is often ignored by `docker logs -f` on Windows; break the
+                # group (this raises in the windowed build, which has no console)
+                proc.send_signal(signal.CTRL_BREAK_EVENT)
+            else:
+                proc.terminate()
         except Exception:
-            pass
+            try:
+                proc.terminate()
+            except Exception:
+                pass
+        if os.name == "nt":
+            # Kill the whole tree if it's still around shortly after, whatever happened above
+            self.after(500, self._kill_if_alive, proc)
         self.log_proc = None
         self.btn_logs.configure(state="normal")
         self.btn_stoplogs.configure(state="disabled")
         self.log("Stopped logs")
 
+    def _on_close(self):
+        # Cancel pending timers so nothing fires against a destroyed window, and don't leave
+        # docker CLI children (log tail, events stream) running after the app exits
+        for after_id in (self._status_after_id, self._log_flush_id):
+            if after_id is not None:
+                self.after_cancel(after_id)
+        self._status_after_id = self._log_flush_id = None
+        for proc in (self.log_proc, self._events_proc):
+            if proc is not None and proc.poll() is None:
+                try:
+                    proc.terminate()
+                except Exception:
+                    pass
+        self.log_proc = self._events_proc = None
+        self.destroy()
+
+    def _kill_if_alive(self, proc):
+        if proc.poll() is not None:
+            return
+        threading.Thread(
+            target=run_quiet, args=(["taskkill", "/F", "/T", "/PID", str(proc.pid)],), daemon=True
+        ).start()
+
 
 if __name__ == "__main__":
     app = Configurator()
@@ -1,30 +1,61 @@
 import os
 import re
-import json
-import subprocess, shutil, platform, shlex
+import subprocess, shutil, platform, shlex, sys
+import ctypes
+import sqlite3, threading
+from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from pymediainfo import MediaInfo
 import ffmpeg
+import orjson
 import errno
+try:
+    # Pure-Python tag/header reader; used for audio so those files skip MediaInfo and ffprobe
+    from mutagen import File as MutagenFile
+except ImportError:
+    MutagenFile = None
 
 VIDEO_EXTS = {'.mp4', '.mov', '.mxf', '.mkv', '.avi', '.m4v', '.webm', '.wmv', '.mpg', '.mpeg', '.ts', '.m2ts', '.mts', '.3gp', '.3g2', '.flv', '.vob', '.ogv', '.dv', '.asf', '.qt', '.png', '.jpg', '.jpeg', '.tiff', '.tif', '.exr', '.dpx', '.bmp', '.gif', '.webp', '.tga', '.cin'}
 AUDIO_EXTS = {'.wav', '.aiff', '.aif', '.mp3', '.m4a', '.flac', '.ogg', '.aac', '.opus', '.wma', '.oga', '.ac3', '.dts', '.alac', '.ape', '.mka'}
 MEDIA_EXTS = VIDEO_EXTS | AUDIO_EXTS
+# Still images: MediaInfo reports no frame rate/duration for these, so ffprobe always ran anyway
+IMAGE_EXTS = {'.png', '.jpg', '.jpeg', '.tiff', '.tif', '.exr', '.dpx', '.bmp', '.gif', '.webp', '.tga', '.cin'}
 
-VERSION_RE = re.compile(r"^(?P<stem>.*)_v(?P<ver>\d{1,3})$", re.IGNORECASE)
+# One C-level search instead of splitext + lower + set lookup per file
+MEDIA_EXT_RE = re.compile(
+    r'(?:' + '|'.join(re.escape(e) for e in sorted(MEDIA_EXTS)) + r')\Z',
+    re.IGNORECASE
+)
+
+# Stem, version and extension in one fullmatch, so parse_version needn't splitext first
+VERSION_RE = re.compile(r"(?P<stem>.*)_v(?P<ver>\d{1,3})(?P<ext>\.[^.]+)?", re.IGNORECASE)
 
 IGNORED_BASENAMES = {'.DS_Store', 'Thumbs.db'}
+def _hidden_name(name: str) -> bool:
+    # skip dotfiles (.foo), which covers AppleDouble (._foo) too
+    return name[:1] == '.' or name in IGNORED_BASENAMES
+
 def is_hidden_path(path: str) -> bool:
-    b = os.path.basename(path)
-    # skip dotfiles (.foo) and AppleDouble (._foo)
-    return b.startswith('.') or b.startswith('._') or b in IGNORED_BASENAMES
+    return _hidden_name(os.path.basename(path))
+
+
+# Each matched extension maps to the one shared lowercase string from MEDIA_EXTS, so
+# 100k records hold a handful of ext objects rather than one fresh string apiece
+_EXT_INTERN = {e: e for e in MEDIA_EXTS}
+
+def media_ext(name: str) -> str | None:
+    """Canonical lowercase extension if name is a media file name, else None (no hidden check)."""
+    m = MEDIA_EXT_RE.search(name)
+    return _EXT_INTERN[m.group(0).lower()] if m else None
 
 
 def is_media_file(path: str) -> bool:
     if is_hidden_path(path):
         return False
-    return os.path.splitext(path)[1].lower() in MEDIA_EXTS
+    return MEDIA_EXT_RE.search(path) is not None
 
 
 def safe_relpath(path: str, base: str) -> str:
@@ -34,60 +65,233 @@ def safe_relpath(path: str, base: str) -> str:
     return rp
 
 
-def file_times(path: str) -> dict:
-    st = os.stat(path)
-    created = datetime.fromtimestamp(getattr(st, 'st_birthtime', st.st_ctime))
+# statx(2) through libc, Linux only: one call returns size/mtime plus the birth time that
+# os.stat can't report there, and AT_STATX_DONT_SYNC lets network mounts answer from cache.
+_STATX_SYSCALL = {'x86_64': 332, 'aarch64': 291}.get(platform.machine()) if sys.platform.startswith('linux') else None
+_AT_FDCWD = -100
+_AT_STATX_DONT_SYNC = 0x4000
+_STATX_BASIC_STATS = 0x07ff
+_STATX_BTIME = 0x0800
+
+
+class _StatxTimestamp(ctypes.Structure):
+    _fields_ = [('tv_sec', ctypes.c_int64), ('tv_nsec', ctypes.c_uint32), ('_reserved', ctypes.c_int32)]
+
+
+class _Statx(ctypes.Structure):
+    _fields_ = [
+        ('stx_mask', ctypes.c_uint32), ('stx_blksize', ctypes.c_uint32), ('stx_attributes', ctypes.c_uint64),
+        ('stx_nlink', ctypes.c_uint32), ('stx_uid', ctypes.c_uint32), ('stx_gid', ctypes.c_uint32),
+        ('stx_mode', ctypes.c_uint16), ('_spare0', ctypes.c_uint16),
+        ('stx_ino', ctypes.c_uint64), ('stx_size', ctypes.c_uint64), ('stx_blocks', ctypes.c_uint64),
+        ('stx_attributes_mask', ctypes.c_uint64),
+        ('stx_atime', _StatxTimestamp), ('stx_btime', _StatxTimestamp),
+        ('stx_ctime', _StatxTimestamp), ('stx_mtime', _StatxTimestamp),
+        ('_spare', ctypes.c_uint8 * 128),  # rest of the kernel's 256-byte struct
+    ]
+
+
+@dataclass(slots=True, frozen=True)
+class StatxResult:
+    """The stat fields the scanner reads, as filled in by statx; st_birthtime is None if the fs has none."""
+    st_size: int
+    st_mtime: float
+    st_mtime_ns: int
+    st_ctime: float
+    st_birthtime: float | None
+
+
+_libc = None
+
+def _statx(path: str) -> StatxResult | None:
+    """statx() the file (following symlinks, like os.stat); None if unavailable or it fails."""
+    global _libc, _STATX_SYSCALL
+    if _STATX_SYSCALL is None:
+        return None
+    try:
+        if _libc is None:
+            _libc = ctypes.CDLL(None, use_errno=True)
+        buf = _Statx()
+        rc = _libc.syscall(_STATX_SYSCALL, _AT_FDCWD, os.fsencode(path), _AT_STATX_DONT_SYNC,
+                           _STATX_BASIC_STATS | _STATX_BTIME, ctypes.byref(buf))
+    except Exception:
+        _STATX_SYSCALL = None  # no usable libc; stop trying
+        return None
+    if rc != 0:
+        if ctypes.get_errno() == errno.ENOSYS:
+            _STATX_SYSCALL = None  # kernel older than 4.11
+        return None
+    mt, ct, bt = buf.stx_mtime, buf.stx_ctime, buf.stx_btime
+    return StatxResult(
+        st_size=buf.stx_size,
+        st_mtime=mt.tv_sec + mt.tv_nsec / 1e9,
+        st_mtime_ns=mt.tv_sec * 1_000_000_000 + mt.tv_nsec,
+        st_ctime=ct.tv_sec + ct.tv_nsec / 1e9,
+        st_birthtime=(bt.tv_sec + bt.tv_nsec / 1e9) if buf.stx_mask & _STATX_BTIME else None,
+    )
+
+
+def file_times(path_or_st) -> dict:
+    # Accepts a stat result (os.stat_result or StatxResult) so callers that already stat'ed the file don't stat it again
+    if isinstance(path_or_st, (os.stat_result, StatxResult)):
+        st = path_or_st
+    else:
+        st = _statx(path_or_st) or os.stat(path_or_st)
+    birth = getattr(st, 'st_birthtime', None)
+    created = datetime.fromtimestamp(birth if birth is not None else st.st_ctime)
     modified = datetime.fromtimestamp(st.st_mtime)
     return {'created_iso': created.isoformat(timespec='seconds'), 'modified_iso': modified.isoformat(timespec='seconds')}
 
 
 def parse_version(filename: str) -> dict:
-    name, _ext = os.path.splitext(filename)
-    m = VERSION_RE.match(name)
-    if m:
-        return {'stem': m.group('stem'), 'version': int(m.group('ver'))}
-    return {'stem': name, 'version': None}
+    stem, version = _parse_version_cached(filename)
+    return {'stem': stem, 'version': version}
 
 
-def ffprobe_streams(path: str) -> dict:
+@lru_cache(maxsize=100_000)
+def _parse_version_cached(filename: str) -> tuple:
+    # Sheet syncs re-parse the same names on every run; cache the immutable (stem, version)
+    # and let parse_version hand each caller its own dict.
+    # Most names carry no version suffix; a substring test is far cheaper than the regex
+    if '_v' in filename or '_V' in filename:
+        m = VERSION_RE.fullmatch(filename)
+        if m:
+            return m.group('stem'), int(m.group('ver'))
+    return os.path.splitext(filename)[0], None
+
+
+@dataclass(slots=True)
+class MediaRow:
+    """
+    One scanned media file. Slots keep a 100k-file scan far smaller than the
+    equivalent dicts; orjson serializes these natively, with the same keys.
+    """
+    path: str
+    name: str
+    ext: str
+    size_bytes: int
+    created_iso: str | None
+    modified_iso: str | None
+    codec: str | None = None
+    width: int | None = None
+    height: int | None = None
+    fps: float | None = None
+    duration_sec: float | None = None
+    has_audio: bool = False
+
+
+# Resolved once at import: a bare 'ffprobe' makes every exec search PATH, and when it
+# isn't installed each scanned file paid for a failed spawn. FFPROBE_BIN overrides.
+FFPROBE_BIN = os.environ.get('FFPROBE_BIN') or shutil.which('ffprobe')
+
+# libmediainfo location (default: pymediainfo's own search). Whether it loads at all is
+# checked once; when it's missing every parse() would retry the dlopen and fail.
+MEDIAINFO_LIB = os.environ.get('MEDIAINFO_LIB') or None
+_MEDIAINFO_OK = None
+
+def _mediainfo_available() -> bool:
+    global _MEDIAINFO_OK
+    if _MEDIAINFO_OK is None:
+        try:
+            _MEDIAINFO_OK = MediaInfo.can_parse(MEDIAINFO_LIB)
+        except Exception:
+            _MEDIAINFO_OK = False
+        if not _MEDIAINFO_OK:
+            print("⚠️ libmediainfo not available; probing with ffprobe only")
+    return _MEDIAINFO_OK
+
+# Only the fields analyze_media reads; the full -show_streams/-show_format dump is tens of KB per file
+FFPROBE_ENTRIES = 'stream=codec_type,codec_name,width,height,avg_frame_rate,r_frame_rate:format=duration'
+# argv prefixes built once; the file path is the only per-call part
+_FFPROBE_STREAMS_ARGS = (FFPROBE_BIN or 'ffprobe', '-v', 'error', '-print_format', 'json', '-show_entries', FFPROBE_ENTRIES)
+_FFPROBE_FPS_DUR_ARGS = (FFPROBE_BIN or 'ffprobe', '-v', 'error',
+                         '-show_entries', 'stream=codec_type,avg_frame_rate,duration:format=duration', '-of', 'json')
+
+def _parse_rate(rate) -> float | None:
+    """ffprobe 'num/den' frame rate as a float; None for '0/0' or anything malformed."""
+    if not rate:
+        return None
+    num_s, sep, den_s = rate.partition('/')
+    if not sep or not num_s.isdigit() or not den_s.isdigit():
+        return None
+    den = int(den_s)
+    return int(num_s) / den if den else None
+
+
+def _run_json(args) -> dict:
+    """Run a JSON-printing tool and parse its stdout bytes with orjson; {} on any failure."""
     try:
-        cmd = ['ffprobe', '-v', 'error', '-print_format', 'json', '-show_streams', '-show_format', path]
-        out = subprocess.check_output(cmd, stderr=subprocess.STDOUT)
-        return json.loads(out.decode('utf-8'))
+        # stderr discarded so a warning can't corrupt the JSON or sit in a buffer
+        res = subprocess.run(args, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        if res.returncode != 0:
+            return {}
+        return orjson.loads(res.stdout)
     except Exception:
         return {}
 
 
-def analyze_media(path: str) -> dict | None:
+def ffprobe_streams(path: str) -> dict:
+    if FFPROBE_BIN is None:
+        return {}
+    return _run_json(_FFPROBE_STREAMS_ARGS + (path,))
+
+
+def analyze_media(path: str, st: os.stat_result | None = None, ext: str | None = None) -> MediaRow | None:
+    """
+    Probe one file. Pass st (e.g. from DirEntry.stat()) to reuse an existing stat,
+    and ext (lowercase, as from media_ext) when the caller already matched it.
+    """
+    # abspath is pure string work; name and ext are sliced from it rather than
+    # via separate basename/splitext passes
+    abs_p = os.path.abspath(path)
+    name = abs_p[abs_p.rfind(os.sep) + 1:]
+
     # Skip hidden/sidecar files early
-    if is_hidden_path(path):
+    if _hidden_name(name):
         return None
-    try:
-        size = os.path.getsize(path)
-        abspath = os.path.abspath(path)
-    except OSError:
-        # unreadable or special file; skip
-        return None
-
-    info = {
-        'path': abspath,
-        'name': os.path.basename(path),
-        'ext': os.path.splitext(path)[1].lower(),
-        'size_bytes': size
-    }
-    try:
-        info.update(file_times(path))
-    except OSError:
-        # if stat fails, still include minimal info
-        info.update({'created_iso': None, 'modified_iso': None})
+    if st is None:
+        try:
+            st = os.stat(path)
+        except OSError:
+            # unreadable or special file; skip
+            return None
+    if ext is None:
+        dot = name.rfind('.')
+        ext = name[dot:].lower() if dot > 0 else ''
+    # One stat covers size and both timestamps
+    times = file_times(st)
 
     codec = width = height = fps = duration_ms = None
     has_audio = False
 
-    try:
-        mi = MediaInfo.parse(path)
-    except Exception:
-        mi = None
+    if ext in AUDIO_EXTS and MutagenFile is not None:
+        # Audio has no width/height/fps (and the codec column is video-only), so the only
+        # thing the probes would add is duration; mutagen reads it from the header without a subprocess.
+        try:
+            mf = MutagenFile(path)
+        except Exception:
+            mf = None
+        length = getattr(getattr(mf, 'info', None), 'length', None)
+        if length:
+            return MediaRow(
+                path=abs_p,
+                name=name,
+                ext=ext,
+                size_bytes=st.st_size,
+                created_iso=times['created_iso'],
+                modified_iso=times['modified_iso'],
+                duration_sec=float(length),
+                has_audio=True,
+            )
+        # Unsupported or unreadable by mutagen: fall through to MediaInfo/ffprobe
+
+    is_video = ext in VIDEO_EXTS
+    mi = None
+    if ext not in IMAGE_EXTS and _mediainfo_available():
+        try:
+            mi = MediaInfo.parse(path, library_file=MEDIAINFO_LIB)
+        except Exception:
+            mi = None
 
     if mi and mi.tracks:
         for t in mi.tracks:
@@ -101,7 +305,13 @@ def analyze_media(path: str) -> dict | None:
                 has_audio = True
                 duration_ms = duration_ms or getattr(t, 'duration', None)
 
-    if any(v is None for v in (codec, width, height, fps, duration_ms)):
+    # Audio files legitimately have no width/height/fps; only fall back to ffprobe
+    # for the fields this kind of file can actually have
+    if is_video:
+        incomplete = any(v is None for v in (codec, width, height, fps, duration_ms))
+    else:
+        incomplete = not (has_audio and duration_ms)
+    if incomplete:
         data = ffprobe_streams(path)
         streams = data.get('streams', [])
         fmt = data.get('format', {})
@@ -109,14 +319,7 @@ def analyze_media(path: str) -> dict | None:
             if s.get('codec_type') == 'video':
                 width = width or s.get('width')
                 height = height or s.get('height')
-                afr = s.get('avg_frame_rate') or s.get('r_frame_rate')
-                if afr and afr != '0/0':
-                    try:
-                        num, den = afr.split('/')
-                        if float(den) != 0:
-                            fps = float(num) / float(den)
-                    except Exception:
-                        pass
+                fps = _parse_rate(s.get('avg_frame_rate') or s.get('r_frame_rate')) or fps
                 codec = codec or s.get('codec_name')
             if s.get('codec_type') == 'audio':
                 has_audio = True
@@ -126,21 +329,275 @@ def analyze_media(path: str) -> dict | None:
             except Exception:
                 duration_ms = None
 
-    info.update({'codec': codec, 'width': width, 'height': height, 'fps': fps, 'duration_sec': (float(duration_ms) / 1000.0) if duration_ms else None, 'has_audio': has_audio})
-    return info
+    return MediaRow(
+        path=abs_p,
+        name=name,
+        ext=ext,
+        size_bytes=st.st_size,
+        created_iso=times['created_iso'],
+        modified_iso=times['modified_iso'],
+        codec=codec,
+        width=width,
+        height=height,
+        fps=fps,
+        duration_sec=(float(duration_ms) / 1000.0) if duration_ms else None,
+        has_audio=has_audio,
+    )
+
+
+# Probe results persisted across scans; set MEDIA_CACHE_PATH to '' to disable
+MEDIA_CACHE_PATH = os.environ.get(
+    'MEDIA_CACHE_PATH', os.path.join(os.environ.get('CONFIG_DIR', '/config'), 'media-cache.sqlite3')
+)
+# Bump whenever analyze_media's output changes; a cache from another version is emptied on open
+MEDIA_CACHE_VERSION = 2
+
+
+class MediaCache:
+    """
+    analyze_media results keyed by (abspath, size, mtime_ns) in SQLite, so files
+    that haven't changed skip MediaInfo/ffprobe on later scans (and restarts).
+    Lookups hit the database directly; stores are buffered until flush().
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._pending = []
+        self._conn = None
+        self._disabled = False
+
+    def _connection(self):
+        if self._conn is None and not self._disabled:
+            try:
+                os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+                conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute('PRAGMA synchronous=NORMAL')
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS files '
+                    '(path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, blob TEXT)'
+                )
+                # Records from another version of analyze_media would be served as-is forever
+                if conn.execute('PRAGMA user_version').fetchone()[0] != MEDIA_CACHE_VERSION:
+                    conn.execute('DELETE FROM files')
+                    conn.execute(f'PRAGMA user_version = {MEDIA_CACHE_VERSION}')
+                self._conn = conn
+            except Exception as e:
+                print(f"⚠️ Media cache disabled ({self.db_path}): {e}")
+                self._disabled = True
+        return self._conn
+
+    def lookup(self, path: str, st: os.stat_result | None = None):
+        """Return (key, cached record or None); key is None if the file can't be stat'ed."""
+        if st is None:
+            try:
+                st = os.stat(path)
+            except OSError:
+                return None, None
+        key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return key, None
+            try:
+                row = conn.execute(
+                    'SELECT blob FROM files WHERE path=? AND size=? AND mtime_ns=?', key
+                ).fetchone()
+            except sqlite3.Error:
+                return key, None
+        return key, (MediaRow(**orjson.loads(row[0])) if row else None)
+
+    def store(self, key, record: MediaRow):
+        with self._lock:
+            # orjson serializes the dataclass directly; stored as TEXT like before
+            self._pending.append((*key, orjson.dumps(record).decode('utf-8')))
+
+    def flush(self):
+        """Write buffered records in one transaction."""
+        with self._lock:
+            if not self._pending:
+                return
+            conn = self._connection()
+            rows, self._pending = self._pending, []
+            if conn is None:
+                return
+            try:
+                conn.execute('BEGIN')
+                conn.executemany('INSERT OR REPLACE INTO files (path, size, mtime_ns, blob) VALUES (?, ?, ?, ?)', rows)
+                conn.execute('COMMIT')
+            except sqlite3.Error as e:
+                try: conn.execute('ROLLBACK')
+                except sqlite3.Error: pass
+                print(f"⚠️ Media cache write failed: {e}")
+
+    def prune(self, root: str, seen):
+        """Drop records under root whose path isn't in seen (moved or deleted since they were stored)."""
+        root = os.path.join(os.path.abspath(root), '')
+        seen = set(seen)
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return
+            try:
+                stale = [(p,) for (p,) in conn.execute(
+                    'SELECT path FROM files WHERE substr(path, 1, ?) = ?', (len(root), root)
+                ) if p not in seen]
+                if not stale:
+                    return
+                conn.execute('BEGIN')
+                conn.executemany('DELETE FROM files WHERE path=?', stale)
+                conn.execute('COMMIT')
+            except sqlite3.Error as e:
+                try: conn.execute('ROLLBACK')
+                except sqlite3.Error: pass
+                print(f"⚠️ Media cache prune failed: {e}")
+
+
+_MEDIA_CACHE = MediaCache(MEDIA_CACHE_PATH) if MEDIA_CACHE_PATH else None
+
+
+def _stat_path(path: str):
+    """statx where available (adds birth time), else os.stat; raises OSError."""
+    return _statx(path) or os.stat(path)
+
+
+def _analyze_cached(path: str, cache: MediaCache | None, st: os.stat_result | None = None, ext: str | None = None):
+    if st is None:
+        try:
+            st = _stat_path(path)
+        except OSError:
+            return None
+    if cache is None:
+        return analyze_media(path, st, ext)
+    key, rec = cache.lookup(path, st)
+    if rec is not None:
+        return rec
+    rec = analyze_media(path, st, ext)
+    if rec is not None and key is not None:
+        cache.store(key, rec)
+    return rec
+
+
+def _iter_media_paths(repo_dir: str, with_stat: bool = True):
+    """
+    Yield (path, stat_result, ext) for media files under repo_dir. Uses scandir directly:
+    DirEntry answers is_dir() from the readdir type field and carries the joined path,
+    so there's no per-entry stat or os.path.join as with os.walk. Media files are
+    stat'ed once here (free on Windows, where scandir fills it in) and that result
+    is reused by the cache lookup and analyze_media. Hidden folders are not descended into.
+
+    ext comes from the same regex match that picks out media files, so nothing
+    downstream splits the name again.
+
+    with_stat=False yields (path, None, ext) and leaves the stat to whoever analyzes the file.
+    """
+    stack = [repo_dir]
+    while stack:
+        d = stack.pop()
+        try:
+            with os.scandir(d) as it:
+                for entry in it:
+                    # Dot-entries (.git, .Trashes, ._foo sidecars...) are never scanned:
+                    # prune hidden folders here rather than walking them to discard every file
+                    if _hidden_name(entry.name):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                            continue
+                    except OSError:
+                        continue
+                    ext = media_ext(entry.name)
+                    if ext is None:
+                        continue
+                    if not with_stat:
+                        yield entry.path, None, ext
+                        continue
+                    try:
+                        # statx on Linux also gives the birth time; DirEntry.stat() is free on Windows
+                        yield entry.path, (_statx(entry.path) or entry.stat()), ext
+                    except OSError:
+                        # vanished or unreadable; analyze_media would skip it too
+                        continue
+        except OSError:
+            # unreadable directory; skip it like os.walk does
+            continue
 
 
-def scan_repo(repo_dir: str):
-    records = []
-    for root, _dirs, files in os.walk(repo_dir):
-        for f in files:
-            p = os.path.join(root, f)
-            if not is_media_file(p):
-                continue
-            rec = analyze_media(p)
+# Probing is mostly waiting on ffprobe/libmediainfo I/O, so oversubscribe the CPUs
+DEFAULT_SCAN_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+
+def iter_scan_repo(repo_dir: str, workers: int | None = None, processes: bool = False):
+    """
+    Yield one record per media file under repo_dir, in walk order.
+
+    Files are analyzed concurrently on `workers` workers (default: DEFAULT_SCAN_WORKERS).
+    Threads are used by default since the time goes to ffprobe/libmediainfo,
+    which don't hold the GIL; processes=True uses a process pool instead.
+    """
+    workers = workers or DEFAULT_SCAN_WORKERS
+    # With a thread pool, let each worker stat its own file: on slow or network mounts
+    # the stat latency then overlaps across workers instead of serializing in the walk.
+    # Windows gets stats free from scandir, and the process pool needs them up front
+    # for the cache lookup in this process.
+    stat_in_walk = processes or workers <= 1 or os.name == 'nt'
+    entries = list(_iter_media_paths(repo_dir, with_stat=stat_in_walk))
+    cache = _MEDIA_CACHE
+    completed = False
+    try:
+        yield from _analyze_paths(entries, workers, processes, cache)
+        completed = True
+    finally:
+        if cache is not None:
+            cache.flush()
+            # Only a full walk knows what's gone; an empty one is more likely an
+            # unmounted share than an empty repo, so leave the cache alone then
+            if completed and entries:
+                cache.prune(repo_dir, (os.path.abspath(p) for p, _st, _ext in entries))
+
+
+def _analyze_paths(entries, workers, processes, cache):
+    if workers <= 1 or len(entries) <= 1:
+        for p, st, ext in entries:
+            rec = _analyze_cached(p, cache, st, ext)
+            if rec is not None:
+                yield rec
+        return
+
+    if processes:
+        # Worker processes can't share the cache connection: look up here and only ship misses
+        looked = [cache.lookup(p, st) if cache is not None else (None, None) for p, st, _ in entries]
+        misses = [e for e, (_key, rec) in zip(entries, looked) if rec is None]
+        ex = ProcessPoolExecutor(max_workers=workers)
+        # Amortize pickling/IPC over several files per task
+        chunksize = max(1, min(32, len(misses) // (workers * 4)))
+        try:
+            fresh = ex.map(analyze_media, *zip(*misses), chunksize=chunksize) if misses else iter(())
+            for key, rec in looked:
+                if rec is None:
+                    rec = next(fresh)
+                    if rec is not None and key is not None and cache is not None:
+                        cache.store(key, rec)
+                if rec is not None:
+                    yield rec
+        finally:
+            ex.shutdown(wait=True, cancel_futures=True)
+        return
+
+    ex = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scan")
+    try:
+        for rec in ex.map(lambda e: _analyze_cached(e[0], cache, e[1], e[2]), entries):
             if rec is not None:
-                records.append(rec)
-    return records
+                yield rec
+    finally:
+        # If the consumer stops early, don't keep probing the rest of the repo
+        ex.shutdown(wait=True, cancel_futures=True)
+
+
+def scan_repo(repo_dir: str, workers: int | None = None, processes: bool = False):
+    return list(iter_scan_repo(repo_dir, workers=workers, processes=processes))
 
 
 def _same_device(path_a: str, path_b: str) -> bool:
@@ -154,6 +611,13 @@ def _same_device(path_a: str, path_b: str) -> bool:
         except Exception:
             return False
 
+def _repo_subdir(src_abs: str, repo_abs: str) -> str:
+    """Parent folder of src_abs relative to repo_abs ('' if directly in it or outside it)."""
+    src_parent = os.path.dirname(src_abs)
+    if src_parent.startswith(repo_abs + os.sep):
+        return os.path.relpath(src_parent, repo_abs)
+    return ""
+
 def _ensure_dir(p: str):
     os.makedirs(p, exist_ok=True)
 
@@ -180,8 +644,7 @@ def _unique_dest(dst_dir: str, basename: str, subdir: str = "") -> str:
 
 
 def _rename_fast(src: str, dst_dir: str, subdir: str = "") -> str:
-    full_dst_dir = os.path.join(dst_dir, subdir) if subdir else dst_dir
-    _ensure_dir(full_dst_dir)
+    # _unique_dest creates the destination folder
     dst = _unique_dest(dst_dir, os.path.basename(src), subdir)
     os.replace(src, dst)
     return dst
@@ -194,7 +657,7 @@ def _rsync_move(src: str, dst_dir: str, on_progress=None, subdir: str = "") -> s
     """Use rsync for cross-device copy; remove source after."""
     full_dst_dir = os.path.join(dst_dir, subdir) if subdir else dst_dir
     _ensure_dir(full_dst_dir)
-    # rsync prints overall progress to stderr with --info=progress2
+    # rsync prints overall progress with --info=progress2
     # We stream and parse percent/bytes to feed UI if on_progress is set.
     cmd = [
         "rsync", "-a", "--info=progress2", "--no-inc-recursive",
@@ -202,28 +665,31 @@ def _rsync_move(src: str, dst_dir: str, on_progress=None, subdir: str = "") -> s
     ]
     proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, bufsize=1)
 
-    if on_progress:
+    # progress2 goes to stdout (text mode splits its "\r"-separated updates into lines).
+    # Always drain it, even without on_progress: a full pipe would stall rsync.
+    for line in proc.stdout:
+        if not on_progress:
+            continue
         # Parse progress like: "  34,567,890  12%   12.34MB/s    0:12:34 (xfr#1, to-chk=0/1)"
-        for line in proc.stderr:
-            line = line.strip()
-            if not line:
-                continue
-            # crude parse: look for "<bytes>  <pct>%"
-            try:
-                parts = line.replace(',', '').split()
-                # parts[0] may be bytes copied so far, parts[1] may be "12%"
-                if len(parts) >= 2 and parts[1].endswith('%'):
-                    bytes_so_far = int(parts[0])
-                    pct = int(parts[1][:-1])
-                    on_progress(bytes_so_far, pct)
-            except Exception:
-                pass
+        line = line.strip()
+        if not line:
+            continue
+        # crude parse: look for "<bytes>  <pct>%"
+        try:
+            parts = line.replace(',', '').split()
+            # parts[0] may be bytes copied so far, parts[1] may be "12%"
+            if len(parts) >= 2 and parts[1].endswith('%'):
+                bytes_so_far = int(parts[0])
+                pct = int(parts[1][:-1])
+                on_progress(bytes_so_far, pct)
+        except Exception:
+            pass
 
+    err = proc.stderr.read()
     proc.wait()
     if proc.returncode != 0:
         # If rsync failed, raise with stderr for visibility
-        err = (proc.stderr.read() if proc.stderr else "") or "rsync error"
-        raise RuntimeError(err.strip())
+        raise RuntimeError(err.strip() or "rsync error")
 
     # rsync with --remove-source-files removes the file; if anything remains, clean up
     if os.path.exists(src):
@@ -232,47 +698,108 @@ def _rsync_move(src: str, dst_dir: str, on_progress=None, subdir: str = "") -> s
 
     return os.path.join(full_dst_dir, os.path.basename(src))
 
-def _mv_move(src: str, dst_dir: str, subdir: str = ""):
-    full_dst_dir = os.path.join(dst_dir, subdir) if subdir else dst_dir
-    _ensure_dir(full_dst_dir)
-    cmd = ["mv", "--", src, full_dst_dir + os.sep]
-    subprocess.run(cmd, check=True)
-    return os.path.join(full_dst_dir, os.path.basename(src))
+COPY_CHUNK = 8 * 1024 * 1024  # large reads keep syscall count low on multi-GB media
+KERNEL_COPY_CHUNK = 64 * 1024 * 1024  # bytes per copy_file_range/sendfile call (one progress update each)
+# Linux can copy file-to-file inside the kernel: copy_file_range (5.3+ across filesystems), else sendfile
+KERNEL_COPY = sys.platform.startswith('linux') and (hasattr(os, 'copy_file_range') or hasattr(os, 'sendfile'))
+_KERNEL_COPY_UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF}
 
-def move_one_fast(src: str, dst_dir: str, on_progress=None, repo_dir: str = None) -> str:
+def _copy_kernel(fd_in: int, fd_out: int, total: int, on_progress=None) -> bool:
+    """
+    Copy fd_in to fd_out without the bytes passing through user space.
+    Returns False (having copied nothing) if this kernel/filesystem pair supports neither call.
+    """
+    calls = []
+    if hasattr(os, 'copy_file_range'):
+        calls.append(lambda n: os.copy_file_range(fd_in, fd_out, n))
+    if hasattr(os, 'sendfile'):
+        calls.append(lambda n: os.sendfile(fd_out, fd_in, None, n))
+    for copy in calls:
+        done = 0
+        try:
+            while True:
+                n = copy(KERNEL_COPY_CHUNK)
+                if not n:
+                    break
+                done += n
+                if on_progress:
+                    on_progress(done, int(done * 100 / total) if total else 100)
+        except OSError as e:
+            if done or e.errno not in _KERNEL_COPY_UNSUPPORTED:
+                raise
+            continue
+        # Some filesystems answer copy_file_range with an immediate 0; try the next call
+        if done or not total:
+            return True
+    return False
+
+def _copy_chunks(fsrc, fdst, total: int, on_progress=None):
+    done = 0
+    buf = bytearray(COPY_CHUNK)
+    view = memoryview(buf)
+    while True:
+        n = fsrc.readinto(buf)
+        if not n:
+            break
+        fdst.write(view[:n])
+        done += n
+        if on_progress:
+            on_progress(done, int(done * 100 / total) if total else 100)
+
+def _copy_move(src: str, dst_dir: str, on_progress=None, subdir: str = "") -> str:
+    """
+    Cross-device move without rsync: in-kernel copy where available, otherwise a
+    chunked read/write loop; both report progress. Then remove the source.
+    """
+    dst = _unique_dest(dst_dir, os.path.basename(src), subdir)
+    total = os.path.getsize(src)
+    try:
+        with open(src, "rb", buffering=0) as fsrc, open(dst, "wb") as fdst:
+            if not (KERNEL_COPY and _copy_kernel(fsrc.fileno(), fdst.fileno(), total, on_progress)):
+                _copy_chunks(fsrc, fdst, total, on_progress)
+        shutil.copystat(src, dst)
+    except BaseException:
+        try: os.remove(dst)
+        except Exception: pass
+        raise
+    os.remove(src)
+    return dst
+
+def move_one_fast(src: str, dst_dir: str, on_progress=None, repo_dir: str = None, subdir: str = None) -> str:
     """
     Move a single file to dst_dir:
       1) try atomic rename (fastest)
-      2) on EXDEV, fall back to rsync (with progress) or mv
+      2) on EXDEV, fall back to an in-kernel copy (Linux), rsync, or a chunked copy
 
     Args:
         src: Source file path
         dst_dir: Base destination directory
         on_progress: Optional progress callback
         repo_dir: Optional repo base directory to preserve folder structure
+        subdir: Precomputed subfolder to preserve (skips deriving it from repo_dir)
     """
     # Calculate subdirectory structure to preserve
-    subdir = ""
-    if repo_dir:
-        try:
-            # Get the relative path from repo_dir to the file's parent directory
-            src_abs = os.path.abspath(src)
-            repo_abs = os.path.abspath(repo_dir)
-            src_parent = os.path.dirname(src_abs)
-            if src_parent.startswith(repo_abs + os.sep):
-                subdir = os.path.relpath(src_parent, repo_abs)
-                # Handle case where file is directly in repo_dir (relpath returns '.')
-                if subdir == '.':
-                    subdir = ""
-        except (ValueError, Exception):
-            # If there's any issue calculating the relative path, just use empty subdir
-            subdir = ""
+    if subdir is None:
+        subdir = ""
+        if repo_dir:
+            try:
+                subdir = _repo_subdir(os.path.abspath(src), os.path.abspath(repo_dir))
+            except (ValueError, Exception):
+                # If there's any issue calculating the relative path, just use empty subdir
+                subdir = ""
 
     _ensure_dir(dst_dir)
 
-    # 1) Try atomic rename regardless of st_dev (Docker Desktop can misreport)
+    # 1) Try atomic rename regardless of st_dev (Docker Desktop can misreport).
+    #    No bytes move on this path, so a same-volume move is a single syscall.
     try:
-        return _rename_fast(src, dst_dir, subdir)
+        dst = _rename_fast(src, dst_dir, subdir)
+        if on_progress:
+            try:
+                on_progress(os.path.getsize(dst), 100)
+            except OSError:
+                on_progress(0, 100)
+        return dst
     except OSError as e:
         # Only fall back if it's a cross-device link error
         if getattr(e, "errno", None) != errno.EXDEV:
@@ -280,10 +807,10 @@ def move_one_fast(src: str, dst_dir: str, on_progress=None, repo_dir: str = None
             if not (isinstance(e.args, tuple) and len(e.args) > 0 and e.args[0] == errno.EXDEV):
                 raise
 
-    # 2) Cross-device fallback
-    if _have("rsync"):
+    # 2) Cross-device fallback: in-kernel copy on Linux, then rsync, then a plain copy loop
+    if not KERNEL_COPY and _have("rsync"):
         return _rsync_move(src, dst_dir, on_progress=on_progress, subdir=subdir)
-    return _mv_move(src, dst_dir, subdir)
+    return _copy_move(src, dst_dir, on_progress=on_progress, subdir=subdir)
 
 
 def move_files(paths, dest_dir, repo_dir=None, on_file_progress=None):
@@ -294,22 +821,19 @@ def move_files(paths, dest_dir, repo_dir=None, on_file_progress=None):
     Returns list of new paths.
     """
     moved = []
+    repo_abs = os.path.abspath(repo_dir) if repo_dir else None
     for p in paths:
+        # One abspath per file serves both the safety check and the subfolder
+        src_abs = os.path.abspath(p)
         # Optional safety: ensure within repo
-        if repo_dir and not os.path.abspath(p).startswith(os.path.abspath(repo_dir) + os.sep):
+        if repo_abs and not src_abs.startswith(repo_abs + os.sep):
             raise ValueError(f"path outside repo: {p}")
 
         # Calculate subdirectory structure to preserve
         subdir = ""
-        if repo_dir:
+        if repo_abs:
             try:
-                src_abs = os.path.abspath(p)
-                repo_abs = os.path.abspath(repo_dir)
-                src_parent = os.path.dirname(src_abs)
-                if src_parent.startswith(repo_abs + os.sep):
-                    subdir = os.path.relpath(src_parent, repo_abs)
-                    if subdir == '.':
-                        subdir = ""
+                subdir = _repo_subdir(src_abs, repo_abs)
             except (ValueError, Exception):
                 subdir = ""
 
@@ -318,15 +842,16 @@ def move_files(paths, dest_dir, repo_dir=None, on_file_progress=None):
             newp = move_one_fast(
                 p, dest_dir,
                 on_progress=(lambda b, pct, fp=p: on_file_progress and on_file_progress(fp, b, pct)),
-                repo_dir=repo_dir
+                repo_dir=repo_dir,
+                subdir=subdir
             )
         except OSError as e:
             # Final safety: explicit EXDEV fallback here as well
             if getattr(e, "errno", None) == errno.EXDEV or (isinstance(e.args, tuple) and len(e.args) > 0 and e.args[0] == errno.EXDEV):
-                if _have("rsync"):
+                if not KERNEL_COPY and _have("rsync"):
                     newp = _rsync_move(p, dest_dir, on_progress=(lambda b, pct, fp=p: on_file_progress and on_file_progress(fp, b, pct)), subdir=subdir)
                 else:
-                    newp = _mv_move(p, dest_dir, subdir)
+                    newp = _copy_move(p, dest_dir, on_progress=(lambda b, pct, fp=p: on_file_progress and on_file_progress(fp, b, pct)), subdir=subdir)
             else:
                 raise
         moved.append(newp)
@@ -345,13 +870,7 @@ def move_with_robocopy(src: str, dst_dir: str, repo_dir: str = None) -> str:
     subdir = ""
     if repo_dir:
         try:
-            src_abs = os.path.abspath(src)
-            repo_abs = os.path.abspath(repo_dir)
-            src_parent = os.path.dirname(src_abs)
-            if src_parent.startswith(repo_abs + os.sep):
-                subdir = os.path.relpath(src_parent, repo_abs)
-                if subdir == '.':
-                    subdir = ""
+            subdir = _repo_subdir(os.path.abspath(src), os.path.abspath(repo_dir))
         except (ValueError, Exception):
             subdir = ""
 
@@ -376,6 +895,10 @@ def _within(base, path):
     except Exception:
         return False
 
+# Proxy/audio jobs already run JOB_WORKERS at a time (see app.py), so each ffmpeg gets a
+# small thread budget instead of one thread per core apiece. 0 leaves it to ffmpeg.
+FFMPEG_THREADS = int(os.environ.get('FFMPEG_THREADS', '2'))
+
 def ffmpeg_proxy(src: str, res_factor: int = 2, alpha: bool = False) -> str:
     """Create a Hap (or Hap Alpha) proxy MOV scaled by 1/res_factor.
     Output: /repo/_proxies/<stem>_proxy{res_factor}.mov
@@ -391,69 +914,42 @@ def ffmpeg_proxy(src: str, res_factor: int = 2, alpha: bool = False) -> str:
     cmd = ['ffmpeg', '-y', '-i', src, '-vf', scale_expr, '-c:v', 'hap']
     if alpha:
         cmd += ['-format', 'hap_alpha']
-    cmd += ['-acodec', 'pcm_s16le', str(out_path)]
+    cmd += ['-acodec', 'pcm_s16le']
+    if FFMPEG_THREADS > 0:
+        cmd += ['-threads', str(FFMPEG_THREADS)]
+    cmd.append(str(out_path))
 
     subprocess.run(cmd, check=True, stderr=subprocess.PIPE)
     return str(out_path)
 
 
-def _probe_fps(src: str) -> float | None:
-    """Return avg frame rate (float) from the first video stream, or None."""
-    try:
-        out = subprocess.check_output([
-            "ffprobe", "-v", "error",
-            "-select_streams", "v:0",
-            "-show_entries", "stream=avg_frame_rate",
-            "-of", "json", src
-        ], stderr=subprocess.STDOUT)
-        data = json.loads(out.decode("utf-8"))
-        streams = data.get("streams") or []
-        if not streams:
-            return None
-        afr = streams[0].get("avg_frame_rate")
-        if afr and afr != "0/0":
-            num, den = afr.split("/")
-            if float(den) != 0:
-                return float(num) / float(den)
-    except Exception:
-        pass
-    return None
-
-def _probe_audio_duration(src: str) -> float | None:
+def _probe_fps_and_duration(src: str) -> tuple[float | None, float | None]:
     """
-    Return duration (seconds) from the first audio stream; fallback to
-    container duration if audio-only probing fails.
+    One ffprobe call for what ffmpeg_extract_audio needs: the first video
+    stream's avg frame rate, and the first audio stream's duration (falling
+    back to the container duration). Either may be None.
     """
-    try:
-        out = subprocess.check_output([
-            "ffprobe", "-v", "error",
-            "-select_streams", "a:0",
-            "-show_entries", "stream=duration",
-            "-of", "json", src
-        ], stderr=subprocess.STDOUT)
-        data = json.loads(out.decode("utf-8"))
-        streams = data.get("streams") or []
-        dur = streams[0].get("duration") if streams else None
-        if dur is not None:
-            return float(dur)
-    except Exception:
-        pass
-
-    # Fallback to container duration
-    try:
-        out = subprocess.check_output([
-            "ffprobe", "-v", "error",
-            "-show_entries", "format=duration",
-            "-of", "json", src
-        ], stderr=subprocess.STDOUT)
-        data = json.loads(out.decode("utf-8"))
-        dur = (data.get("format") or {}).get("duration")
-        if dur is not None:
-            return float(dur)
-    except Exception:
-        pass
-
-    return None
+    data = _run_json(_FFPROBE_FPS_DUR_ARGS + (src,))
+    if not data:
+        return None, None
+
+    fps = dur = None
+    for s in data.get("streams") or []:
+        kind = s.get("codec_type")
+        if kind == "video" and fps is None:
+            fps = _parse_rate(s.get("avg_frame_rate"))
+        elif kind == "audio" and dur is None and s.get("duration") is not None:
+            try:
+                dur = float(s["duration"])
+            except ValueError:
+                pass
+    if dur is None:
+        try:
+            fmt_dur = (data.get("format") or {}).get("duration")
+            dur = float(fmt_dur) if fmt_dur is not None else None
+        except ValueError:
+            dur = None
+    return fps, dur
 
 def ffmpeg_extract_audio(src: str, out_dir: str | None = None) -> str:
     """
@@ -467,8 +963,8 @@ def ffmpeg_extract_audio(src: str, out_dir: str | None = None) -> str:
     target_dir.mkdir(parents=True, exist_ok=True)
     out_path = str(target_dir / f"{p.stem}_hapaudio.mov")
 
-    fps = _probe_fps(src) or 30
-    dur = _probe_audio_duration(src)  # seconds (float) or None
+    fps, dur = _probe_fps_and_duration(src)  # dur: seconds (float) or None
+    fps = fps or 30
 
     try:
         # Build the black filler as a lavfi input with desired r (fps) and d (duration)
@@ -489,6 +985,8 @@ def ffmpeg_extract_audio(src: str, out_dir: str | None = None) -> str:
             ar=48000,
             tune='stillimage'
         )
+        if FFMPEG_THREADS > 0:
+            common_output_args['threads'] = FFMPEG_THREADS
         out = ffmpeg.output(color, audio, out_path, **common_output_args)
 
         if not dur:
@@ -1,53 +1,95 @@
+import atexit
+import os
+import re
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, wraps
+from operator import attrgetter
 import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-from media_utils import parse_version
+import orjson
+from media_utils import MediaRow, parse_version
 
 SCOPE = [
     'https://www.googleapis.com/auth/spreadsheets',
     'https://www.googleapis.com/auth/drive',
 ]
 
+# SheetIndex snapshots survive restarts here; set SHEET_CACHE_PATH to '' to disable
+SHEET_CACHE_PATH = os.environ.get(
+    'SHEET_CACHE_PATH', os.path.join(os.environ.get('CONFIG_DIR', '/config'), 'sheet-index.json')
+)
+
+# Large syncs are split into batchUpdate requests of at most this many rows,
+# sent WRITE_WORKERS at a time
+WRITE_CHUNK_ROWS = 1000
+WRITE_WORKERS = 4
+
+# Sheets/Drive answers worth retrying (rate limit, timeout, server side), and how often
+TRANSIENT_STATUS = frozenset({408, 429, 500, 502, 503, 504})
+RETRIES = 5
+
+def _retry(fn):
+    """Retry fn on transient APIErrors, sleeping 1s, 2s, 4s... plus jitter; other errors raise at once."""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        for attempt in range(RETRIES + 1):
+            try:
+                return fn(*args, **kwargs)
+            except gspread.exceptions.APIError as e:
+                if attempt == RETRIES or getattr(e.response, 'status_code', None) not in TRANSIENT_STATUS:
+                    raise
+                time.sleep(2 ** attempt + random.random())
+    return wrapper
+
 # Columns the app owns. Anything else in the sheet is considered "custom" and preserved.
-MANAGED_HEADERS = [
+# Header constants are tuples so they can't be mutated; hand gspread list(...) copies.
+MANAGED_HEADERS = (
     'stem','version','filename','ext','path','size_bytes','codec','width','height',
     'fps','duration_sec','has_audio','created_iso','modified_iso'
-]
-
-def open_sheet(sa_json_path: str, sheet_name: str, worksheet_name: str = None):
-    """
-    Open a Google Sheet and return a specific worksheet.
+)
+UPLOAD_LOG_HEADERS = ('timestamp', 'version', 'ext', 'path')
 
-    Args:
-        sa_json_path: Path to service account JSON file
-        sheet_name: Name of the Google Sheets document
-        worksheet_name: Name of the worksheet/tab to open. If None, opens first sheet.
-
-    Returns:
-        The requested worksheet object
+def _sa_mtime(sa_json_path: str) -> int:
+    """Modification stamp of the service account file; part of every cache key so a re-upload re-authorizes."""
+    try:
+        return os.stat(sa_json_path).st_mtime_ns
+    except OSError:
+        # Let the credential loader report the missing file
+        return 0
 
-    Raises:
-        Exception: With specific error messages for common issues
+@lru_cache(maxsize=4)
+def _client(sa_json_path: str, sa_mtime: int):
+    """
+    google-auth credentials + gspread client, built once per service account file version.
+    The client's requests session keeps its connection alive across calls.
     """
     try:
-        creds = ServiceAccountCredentials.from_json_keyfile_name(sa_json_path, SCOPE)
+        return gspread.service_account(filename=sa_json_path, scopes=SCOPE)
     except FileNotFoundError:
         raise Exception(f"Service account JSON file not found: {sa_json_path}")
-    except ValueError as e:
+    except (ValueError, KeyError) as e:
         raise Exception(f"Invalid service account JSON file: {str(e)}")
     except Exception as e:
         raise Exception(f"Failed to load credentials: {str(e)}")
 
-    try:
-        client = gspread.authorize(creds)
-    except Exception as e:
-        raise Exception(f"Authentication failed: {str(e)}")
+@_retry
+def _open(client, sheet_name: str):
+    return client.open(sheet_name)
 
+@lru_cache(maxsize=8)
+def _spreadsheet(sa_json_path: str, sa_mtime: int, sheet_name: str):
+    """Open (or create) the spreadsheet once per service account file version."""
+    client = _client(sa_json_path, sa_mtime)
     try:
-        sh = client.open(sheet_name)
+        return _open(client, sheet_name)
     except gspread.SpreadsheetNotFound:
         try:
             sh = client.create(sheet_name)
             print(f"✅ Created new spreadsheet '{sheet_name}'")
+            return sh
         except Exception as e:
             raise Exception(f"Sheet '{sheet_name}' not found and could not be created. Make sure the service account has access to Google Drive API. Error: {str(e)}")
     except Exception as e:
@@ -57,6 +99,31 @@ def open_sheet(sa_json_path: str, sheet_name: str, worksheet_name: str = None):
         else:
             raise Exception(f"Failed to open sheet '{sheet_name}': {error_msg}")
 
+def open_sheet(sa_json_path: str, sheet_name: str, worksheet_name: str = None):
+    """
+    Open a Google Sheet and return a specific worksheet.
+
+    The client, spreadsheet and worksheet handles are cached per service account
+    file version, so repeat calls skip auth and open. Managed headers are added
+    by the first sync_records on the worksheet.
+
+    Args:
+        sa_json_path: Path to service account JSON file
+        sheet_name: Name of the Google Sheets document
+        worksheet_name: Name of the worksheet/tab to open. If None, opens first sheet.
+
+    Returns:
+        The requested worksheet object
+
+    Raises:
+        Exception: With specific error messages for common issues
+    """
+    return _worksheet(sa_json_path, _sa_mtime(sa_json_path), sheet_name, worksheet_name)
+
+@lru_cache(maxsize=8)
+def _worksheet(sa_json_path: str, sa_mtime: int, sheet_name: str, worksheet_name: str = None):
+    sh = _spreadsheet(sa_json_path, sa_mtime, sheet_name)
+
     # Get the desired worksheet
     try:
         if worksheet_name:
@@ -70,44 +137,51 @@ def open_sheet(sa_json_path: str, sheet_name: str, worksheet_name: str = None):
     except Exception as e:
         raise Exception(f"Failed to access worksheet: {str(e)}")
 
-    # Ensure header row exists; do NOT wipe existing custom columns.
-    try:
-        existing = ws.row_values(1)
-        if not existing:
-            ws.append_row(MANAGED_HEADERS)
-            existing = ws.row_values(1)
+    # Headers are checked by the first sync (SheetIndex.refresh), which reads row 1 anyway
+    return ws
 
-        # Append any missing managed headers to the right
-        missing = [h for h in MANAGED_HEADERS if h not in existing]
+def _ensure_headers(ws, existing: list) -> list:
+    """Add any missing managed headers to row 1; do NOT wipe existing custom columns. Returns the headers."""
+    try:
+        # Append any missing managed headers to the right (all of them on a blank sheet)
+        present = set(existing)
+        missing = [h for h in MANAGED_HEADERS if h not in present]
         if missing:
             new_headers = existing + missing
             ws.update(f"A1:{col_letter(len(new_headers))}1", [new_headers])
             existing = new_headers
     except Exception as e:
         raise Exception(f"Failed to setup headers: {str(e)}")
+    return existing
 
-    return ws
+def forget_sheets():
+    """Drop cached clients and handles, e.g. after a worksheet was deleted or settings changed."""
+    _worksheet.cache_clear()
+    _upload_log_ws.cache_clear()
+    _INDEXES.clear()
+    _spreadsheet.cache_clear()
+    _client.cache_clear()
 
-def to_row_dict(rec: dict) -> dict:
-    """Return a dict of managed fields for easy merging into an existing row vector."""
-    pv = parse_version(rec['name'])
-    return {
-        'stem': pv['stem'],
-        'version': pv['version'], #keep as int if possible
-        'filename': rec.get('name'),
-        'ext': rec.get('ext'),
-        'path': rec.get('path'),
-        'size_bytes': rec.get('size_bytes'),
-        'codec': rec.get('codec'),
-        'width': rec.get('width'),
-        'height': rec.get('height'),
-        'fps': rec.get('fps'),
-        'duration_sec': rec.get('duration_sec'),
-        'has_audio': rec.get('has_audio'),
-        'created_iso': rec.get('created_iso'),
-        'modified_iso': rec.get('modified_iso'),
-    }
+# MediaRow attributes behind MANAGED_HEADERS[2:], in the same order; one C-level call per record
+_RECORD_FIELDS = attrgetter(
+    'name','ext','path','size_bytes','codec','width','height',
+    'fps','duration_sec','has_audio','created_iso','modified_iso'
+)
+
+def managed_values(rec: MediaRow, pv: dict) -> tuple:
+    """Managed field values in MANAGED_HEADERS order; version stays an int if possible."""
+    return (pv['stem'], pv['version'], *_RECORD_FIELDS(rec))
+
+def to_row_dict(rec: MediaRow, pv: dict = None) -> dict:
+    """
+    Return a dict of managed fields for easy merging into an existing row vector.
+    Pass pv when the caller already ran parse_version(rec.name).
+    """
+    if pv is None:
+        pv = parse_version(rec.name)
+    return dict(zip(MANAGED_HEADERS, managed_values(rec, pv)))
 
+@lru_cache(maxsize=128)
 def col_letter(n: int) -> str:
     """1 -> A, 2 -> B, ..."""
     s = ""
@@ -116,103 +190,356 @@ def col_letter(n: int) -> str:
         s = chr(65 + r) + s
     return s
 
+class SheetIndex:
+    """
+    Headers, stem -> row map and current managed values for one worksheet, kept
+    in memory between syncs.
+
+    The spreadsheet's Drive modifiedTime is checked before each sync; the managed
+    columns are only downloaded again when someone else changed the file.
+    """
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.headers = []
+        self.managed_cols = []  # (MANAGED_HEADERS position, 0-based column) for managed headers present in the sheet
+        self.spans = []         # managed_cols grouped into (first, last) runs of adjacent columns
+        self.stem_to_row = {}
+        self.row_values = {}    # rnum -> _cell_key() of each managed cell, in managed_cols order
+        self.modified = None    # Drive modifiedTime the map was built against
+        self.lock = threading.Lock()  # one sync per worksheet at a time
+
+    def _set_headers(self, headers: list):
+        self.headers = headers
+        header_to_idx = {h: i for i, h in enumerate(headers)}  # 0-based
+        self.managed_cols = [(pos, header_to_idx[key]) for pos, key in enumerate(MANAGED_HEADERS) if key in header_to_idx]
+        self.spans = _col_spans(sorted(col for _, col in self.managed_cols))
+
+    def load(self, snap: dict):
+        """Adopt a snapshot saved by to_snapshot(); refresh() still checks it against Drive."""
+        self._set_headers(snap['headers'])
+        self.stem_to_row = snap['stem_to_row']
+        # Older snapshots hold formatted cell text; keying again is a no-op for current ones
+        self.row_values = {rnum: tuple(map(_cell_key, cells)) for rnum, cells in snap['row_values']}
+        self.modified = snap['modified']
+
+    def to_snapshot(self) -> dict:
+        return {
+            'headers': self.headers,
+            'stem_to_row': self.stem_to_row,
+            'row_values': list(self.row_values.items()),
+            'modified': self.modified,
+        }
+
+    def _last_update(self):
+        try:
+            return self.ws.spreadsheet.get_lastUpdateTime()
+        except Exception:
+            # No Drive API access: never trust the cached map
+            return None
+
+    @_retry
+    def refresh(self):
+        """Reload headers and managed values unless the spreadsheet is unchanged since the last load/write."""
+        modified = self._last_update()
+        if modified is not None and modified == self.modified:
+            return
+        existing = self.ws.row_values(1)
+        headers = _ensure_headers(self.ws, existing)
+        if headers is not existing:
+            # Our own header write bumped modifiedTime
+            modified = self._last_update()
+        self._set_headers(headers)
+        self.stem_to_row = {}
+        self.row_values = {}
+        if 'stem' in self.headers:
+            # One values.batchGet for the managed column runs; custom columns stay on the server.
+            # Unformatted values don't depend on the sheet's number formats or locale.
+            ranges = [f"{col_letter(first + 1)}2:{col_letter(last + 1)}" for first, last in self.spans]
+            fetched = self.ws.batch_get(ranges, value_render_option='UNFORMATTED_VALUE')
+            nrows = max((len(v) for v in fetched), default=0)
+            # column -> (span values, offset within the span)
+            where = {}
+            for (first, last), vals in zip(self.spans, fetched):
+                for col in range(first, last + 1):
+                    where[col] = (vals, col - first)
+            for i in range(nrows):
+                cells = []
+                for _, col in self.managed_cols:
+                    vals, off = where[col]
+                    row = vals[i] if i < len(vals) else []
+                    cells.append(row[off] if off < len(row) else "")
+                rnum = i + 2
+                # 'stem' leads MANAGED_HEADERS, so it is the first managed cell
+                stem_val = str(cells[0]).strip()
+                if stem_val:
+                    self.stem_to_row[stem_val] = rnum
+                    self.row_values[rnum] = tuple(map(_cell_key, cells))
+        self.modified = modified
+        _save_index(self)
+
+    def wrote(self):
+        """Record our own write so it doesn't force a reload next time."""
+        if self.modified is not None:
+            self.modified = self._last_update()
+            _save_index(self)
+
+
+_INDEXES = {}  # (spreadsheet id, worksheet id) -> SheetIndex
+_FETCH_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix='sheet-fetch')
+_SNAPSHOTS = None  # "spreadsheet id:worksheet id" -> SheetIndex.to_snapshot(), as on disk
+_SNAPSHOTS_LOCK = threading.Lock()
+
+def _snapshot_key(ws) -> str:
+    return f"{ws.spreadsheet_id}:{ws.id}"
+
+def _load_snapshots() -> dict:
+    global _SNAPSHOTS
+    if _SNAPSHOTS is None:
+        _SNAPSHOTS = {}
+        if SHEET_CACHE_PATH and os.path.isfile(SHEET_CACHE_PATH):
+            try:
+                with open(SHEET_CACHE_PATH, 'rb') as f:
+                    _SNAPSHOTS = orjson.loads(f.read())
+            except Exception as e:
+                print(f"⚠️ Ignoring unreadable sheet cache {SHEET_CACHE_PATH}: {e}")
+    return _SNAPSHOTS
+
+def _save_index(index: SheetIndex):
+    """Persist one index's snapshot; only snapshots tied to a Drive modifiedTime are worth keeping."""
+    if not SHEET_CACHE_PATH or index.modified is None:
+        return
+    with _SNAPSHOTS_LOCK:
+        snaps = _load_snapshots()
+        snaps[_snapshot_key(index.ws)] = index.to_snapshot()
+        cache_dir = os.path.dirname(SHEET_CACHE_PATH) or '.'
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=cache_dir, prefix='sheet-index.', suffix='.json')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(orjson.dumps(snaps))
+                # Same-directory rename: a crash never leaves a half-written cache
+                os.replace(tmp, SHEET_CACHE_PATH)
+            except Exception:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
+                raise
+        except Exception as e:
+            print(f"⚠️ Could not write sheet cache {SHEET_CACHE_PATH}: {e}")
+
+def sheet_index(ws) -> SheetIndex:
+    key = (ws.spreadsheet_id, ws.id)
+    idx = _INDEXES.get(key)
+    if idx is None or idx.ws is not ws:
+        idx = _INDEXES[key] = SheetIndex(ws)
+        with _SNAPSHOTS_LOCK:
+            snap = _load_snapshots().get(_snapshot_key(ws))
+        if snap:
+            try:
+                idx.load(snap)
+            except Exception:
+                # Stale layout from an older version; start empty and let refresh() reload
+                idx = _INDEXES[key] = SheetIndex(ws)
+    return idx
+
+
 def sync_records(ws, records: list):
     """
     Preserve any extra columns:
-    - Read the whole sheet
+    - Read only the managed columns (and only when the sheet changed since the last sync)
     - Build a stem->row map
-    - For existing rows, update only managed columns, leaving others alone
-    - For new rows, append rows with managed data; extra columns remain blank
+    - For existing rows whose managed values changed, write only managed columns
+    - For new rows, append managed data below the sheet's last used row; extra columns remain blank
     """
-    # 1) Headers & index maps
-    headers = ws.row_values(1)
-    header_to_idx = {h: i for i, h in enumerate(headers)}  # 0-based
-    num_cols = len(headers)
-    stem_col = header_to_idx.get('stem')
-    if stem_col is None:
-        raise RuntimeError("Sheet is missing 'stem' column after header setup.")
+    index = sheet_index(ws)
+    with index.lock:
+        _sync_records(ws, index, records)
 
-    # 2) Fetch existing rows (raw values) and build stem -> rownum map (2-based)
-    # Use get_all_values for exact shape & custom columns
-    all_vals = ws.get_all_values()
-    rows = all_vals[1:] if len(all_vals) > 1 else []
-    stem_to_rownum = {}
-    for i, row in enumerate(rows, start=2):
-        stem_val = row[stem_col].strip() if stem_col < len(row) else ""
-        if stem_val:
-            stem_to_rownum[stem_val] = i
 
-    # 3) Prepare batch updates
-    batch_updates = []   # each item: {'range': 'A{r}:{Z}{r}', 'values': [[...]]}
-    appends = []         # 2D list of new rows
+def _cell_key(val) -> str:
+    """
+    Comparable form of a managed cell, so a value we'd write and the UNFORMATTED_VALUE
+    the sheet returns for it agree: booleans as TRUE/FALSE (whatever their case or
+    type) and numbers in one spelling, e.g. 12, 12.0 and "12.0" are all "12".
+    """
+    if val is None:
+        return ""
+    if isinstance(val, bool):
+        return "TRUE" if val else "FALSE"
+    if isinstance(val, str):
+        upper = val.upper()
+        if upper in ("TRUE", "FALSE"):
+            return upper
+        try:
+            val = float(val)
+        except ValueError:
+            return val
+    if isinstance(val, float) and val.is_integer():
+        return str(int(val))
+    return str(val)
+
 
+def _cell_values(records: list) -> list:
+    """(stem, cell values in MANAGED_HEADERS order) per keyed record; needs nothing from the sheet."""
+    prepared = []
     for rec in records:
-        managed = to_row_dict(rec)
-        stem = managed['stem']
+        # Parse once; records without a usable key are dropped before any row assembly
+        pv = parse_version(rec.name)
+        stem = pv['stem']
         if not stem:
-            # Skip rows without a usable key
             continue
+        cells = [
+            "" if val is None else val if pos == 1 and isinstance(val, (int, float)) else str(val)
+            for pos, val in enumerate(managed_values(rec, pv))   # pos 1 = version, kept numeric
+        ]
+        prepared.append((stem, cells))
+    return prepared
 
-        # Build a full row vector of current sheet width; start with existing row or blanks
-        if stem in stem_to_rownum:
-            rnum = stem_to_rownum[stem]
-            # get existing row into a vector of fixed width
-            idx_in_rows = rnum - 2
-            existing_row = rows[idx_in_rows] if 0 <= idx_in_rows < len(rows) else []
-            row_vec = (existing_row + [""] * (num_cols - len(existing_row)))[:num_cols]
-        else:
-            rnum = None
-            row_vec = [""] * num_cols
-
-        # Merge managed fields into row_vec at their column positions
-        for key, val in managed.items():
-            if key in header_to_idx:
-                if val is None:
-                    row_vec[header_to_idx[key]] = ""
-                else:
-                    if key == 'version' and isinstance(val, (int, float)):
-                        row_vec[header_to_idx[key]] = val
-                    else:
-                        row_vec[header_to_idx[key]] = str(val)
-                # row_vec[header_to_idx[key]] = "" if val is None else str(val)
-
-        if rnum:
-            # Update the whole row range with the merged vector (preserves custom columns' current values)
-            rng = f"A{rnum}:{col_letter(num_cols)}{rnum}"
-            batch_updates.append({'range': rng, 'values': [row_vec]})
+
+def _sync_records(ws, index: SheetIndex, records: list):
+    # 1) Headers, stem -> rownum map (2-based) and current values, fetched on a
+    # worker while this thread does the sheet-independent parse/format work.
+    # Custom columns are never read: writes below only touch managed columns.
+    fetch = _FETCH_EXECUTOR.submit(index.refresh)
+    try:
+        prepared = _cell_values(records)
+    finally:
+        # Never leave the refresh running unobserved; re-raises its error
+        fetch.result()
+    if 'stem' not in index.headers:
+        raise RuntimeError("Sheet is missing 'stem' column after header setup.")
+    num_cols = len(index.headers)
+    managed_cols = index.managed_cols
+    stem_to_rownum = index.stem_to_row
+    current = index.row_values
+
+    # 2) Prepare batch updates
+    updated_rows = {}    # rnum -> row; a later record for the same stem wins
+    written = {}         # rnum -> _cell_key() of the managed cells written
+    new_rows = {}        # stem -> (row, cells) for stems not in the sheet yet, in record order
+
+    for stem, vals in prepared:
+        # Full-width vector; only the managed positions are filled and written
+        row_vec = [""] * num_cols
+        for pos, col in managed_cols:
+            row_vec[col] = vals[pos]
+        cells = tuple(_cell_key(vals[pos]) for pos, _ in managed_cols)
+
+        rnum = stem_to_rownum.get(stem)
+        if rnum is None:
+            # New row: appended below the sheet's data; custom columns remain blank by design
+            new_rows[stem] = (row_vec, cells)
+            continue
+        if rnum not in updated_rows and current.get(rnum) == cells:
+            # Sheet already shows exactly these values
+            continue
+
+        updated_rows[rnum] = row_vec
+        written[rnum] = cells
+
+    if not updated_rows and not new_rows:
+        return
+
+    # 3) Update existing rows in values batchUpdates: ranges cover runs of adjacent rows
+    # within runs of adjacent managed columns, and RAW stores the values without
+    # locale/date parsing
+    if updated_rows:
+        requests = _write_batches(_row_blocks(updated_rows, index.spans, WRITE_CHUNK_ROWS), WRITE_CHUNK_ROWS)
+        write = lambda blocks: _write(ws, blocks)
+        if len(requests) == 1:
+            write(requests[0])
         else:
-            # New row: append; custom columns remain blank by design
-            appends.append(row_vec)
+            # Disjoint ranges, so order doesn't matter; list() re-raises the first failure
+            with ThreadPoolExecutor(max_workers=WRITE_WORKERS) as ex:
+                list(ex.map(write, requests))
+        current.update(written)
 
-    # 4) Apply updates efficiently
-    if batch_updates:
-        ws.batch_update(batch_updates)
-    if appends:
-        ws.append_rows(appends)
+    # 4) Append new stems. Sheets finds the end of the table across every column,
+    # so rows holding only custom data are never overwritten; the response says
+    # where each chunk landed. Chunks go one at a time to keep record order, and are
+    # not retried: an append that timed out may have landed, and a retry would duplicate it.
+    stems = list(new_rows)
+    for start in range(0, len(stems), WRITE_CHUNK_ROWS):
+        chunk = stems[start:start + WRITE_CHUNK_ROWS]
+        resp = ws.append_rows(
+            [new_rows[stem][0] for stem in chunk],
+            value_input_option='RAW', insert_data_option='INSERT_ROWS',
+        )
+        first_row = _first_row(resp['updates']['updatedRange'])
+        for rnum, stem in enumerate(chunk, start=first_row):
+            stem_to_rownum[stem] = rnum
+            current[rnum] = new_rows[stem][1]
 
+    # Only now that every write landed does the index take the new modifiedTime
+    index.wrote()
 
-def log_upload(sa_json_path: str, sheet_name: str, file_path: str, timestamp: str):
-    """
-    Log a file upload/processing event to the 'upload_log' worksheet.
 
-    Args:
-        sa_json_path: Path to service account JSON file
-        sheet_name: Name of the Google Sheets document
-        file_path: Full path of the file being logged
-        timestamp: ISO timestamp of when the file was processed
+def _first_row(a1_range: str) -> int:
+    """First row number of an A1 range such as "'Sheet 1'!A57:O60"."""
+    cells = a1_range.rsplit('!', 1)[-1]
+    return int(re.match(r"[A-Za-z]*(\d+)", cells).group(1))
+
+
+def _col_spans(cols: list) -> list:
+    """Group sorted 0-based column positions into (first, last) runs of adjacent columns."""
+    spans = []
+    for c in cols:
+        if spans and c == spans[-1][1] + 1:
+            spans[-1] = (spans[-1][0], c)
+        else:
+            spans.append((c, c))
+    return spans
+
+
+def _row_blocks(rows_by_num: dict, spans: list, max_rows: int = 0) -> list:
     """
-    from media_utils import parse_version
-    import os
+    Coalesce {rownum: row} into batch_update items, one per run of consecutive rows
+    per column span. Runs are capped at max_rows rows when it is set.
+    """
+    runs = []
+    for rnum in sorted(rows_by_num):
+        if runs and rnum == runs[-1][1] + 1 and not (max_rows and rnum - runs[-1][0] >= max_rows):
+            runs[-1][1] = rnum
+        else:
+            runs.append([rnum, rnum])
+    blocks = []
+    for first_row, last_row in runs:
+        rows = [rows_by_num[r] for r in range(first_row, last_row + 1)]
+        for first_col, last_col in spans:
+            blocks.append({
+                'range': f"{col_letter(first_col + 1)}{first_row}:{col_letter(last_col + 1)}{last_row}",
+                'values': [row[first_col:last_col + 1] for row in rows],
+            })
+    return blocks
 
-    # Open the upload_log worksheet (will be created if doesn't exist)
-    creds = ServiceAccountCredentials.from_json_keyfile_name(sa_json_path, SCOPE)
-    client = gspread.authorize(creds)
-    try:
-        sh = client.open(sheet_name)
-    except gspread.SpreadsheetNotFound:
-        sh = client.create(sheet_name)
 
-    # Get or create upload_log worksheet
+def _write_batches(blocks: list, max_rows: int) -> list:
+    """Group batch_update items into requests carrying at most max_rows rows each."""
+    batches = []
+    rows = 0
+    for block in blocks:
+        n = len(block['values'])
+        if not batches or rows + n > max_rows:
+            batches.append([])
+            rows = 0
+        batches[-1].append(block)
+        rows += n
+    return batches
+
+
+@_retry
+def _write(ws, blocks: list):
+    # Explicit ranges make the write idempotent, so retrying is safe
+    ws.batch_update(blocks, value_input_option='RAW')
+
+
+@lru_cache(maxsize=8)
+def _upload_log_ws(sa_json_path: str, sa_mtime: int, sheet_name: str):
+    """Get or create the upload_log worksheet, with headers, once per service account file version."""
+    sh = _spreadsheet(sa_json_path, sa_mtime, sheet_name)
     try:
         ws = sh.worksheet('upload_log')
     except gspread.WorksheetNotFound:
@@ -221,15 +548,109 @@ def log_upload(sa_json_path: str, sheet_name: str, file_path: str, timestamp: st
     # Ensure headers exist
     headers = ws.row_values(1)
     if not headers:
-        ws.append_row(['timestamp', 'version', 'ext', 'path'])
+        ws.append_row(list(UPLOAD_LOG_HEADERS))
+    return ws
 
-    # Extract file information
+
+def _upload_log_row(file_path: str, timestamp: str) -> list:
+    """One upload_log row: timestamp, version, ext (no dot), full path."""
     filename = os.path.basename(file_path)
     _, ext = os.path.splitext(filename)
     ext = ext.lstrip('.')  # Remove leading dot
 
     parsed = parse_version(filename)
     version = parsed.get('version', '')
+    return [timestamp, version, ext, file_path]
+
+
+def log_upload(sa_json_path: str, sheet_name: str, file_path: str, timestamp: str):
+    """
+    Log a file upload/processing event to the 'upload_log' worksheet.
+
+    Args:
+        sa_json_path: Path to service account JSON file
+        sheet_name: Name of the Google Sheets document
+        file_path: Full path of the file being logged
+        timestamp: ISO timestamp of when the file was processed
+    """
+    ws = _upload_log_ws(sa_json_path, _sa_mtime(sa_json_path), sheet_name)
 
     # Append the log entry
-    ws.append_row([timestamp, version, ext, file_path])
+    # Not retried: an append that timed out may already have landed, and a retry would log it twice
+    ws.append_row(_upload_log_row(file_path, timestamp))
+
+
+class LogBuffer:
+    """
+    Collects upload_log rows and appends them in batches, one append_rows call per
+    spreadsheet, every `interval` seconds or as soon as `max_rows` rows are waiting.
+    The background flusher starts on the first add().
+    """
+
+    def __init__(self, interval: float = 5.0, max_rows: int = 100):
+        self.interval = interval
+        self.max_rows = max_rows
+        self._pending = {}  # (sa_json_path, sheet_name) -> [row, ...]
+        self._count = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # keeps batches in order
+        self._wake = threading.Event()
+        self._thread = None
+
+    def add(self, sa_json_path: str, sheet_name: str, file_path: str, timestamp: str):
+        row = _upload_log_row(file_path, timestamp)
+        with self._lock:
+            self._pending.setdefault((sa_json_path, sheet_name), []).append(row)
+            self._count += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='upload-log-flush', daemon=True)
+                self._thread.start()
+            if self._count >= self.max_rows:
+                self._wake.set()
+
+    def flush(self) -> int:
+        """Append everything queued so far; returns the number of rows written."""
+        with self._flush_lock:
+            return self._flush_pending()
+
+    def write(self, sa_json_path: str, sheet_name: str, file_paths, timestamp: str) -> int:
+        """
+        Append rows for file_paths now, in one call, after anything already queued.
+        Returns how many of these rows were written (0 or all of them), unaffected
+        by rows other requests queue or the background flusher writes meanwhile.
+        """
+        rows = [_upload_log_row(p, timestamp) for p in file_paths]
+        with self._flush_lock:
+            self._flush_pending()
+            return len(rows) if rows and self._append(sa_json_path, sheet_name, rows) else 0
+
+    def _flush_pending(self) -> int:
+        with self._lock:
+            pending, self._pending, self._count = self._pending, {}, 0
+        written = 0
+        for (sa_json_path, sheet_name), rows in pending.items():
+            if self._append(sa_json_path, sheet_name, rows):
+                written += len(rows)
+        return written
+
+    @staticmethod
+    def _append(sa_json_path: str, sheet_name: str, rows: list) -> bool:
+        try:
+            ws = _upload_log_ws(sa_json_path, _sa_mtime(sa_json_path), sheet_name)
+            # Not retried (see log_upload); a failed batch is reported and dropped
+            ws.append_rows(rows, value_input_option='RAW')
+            return True
+        except Exception as e:
+            print(f"❌ WARNING: Failed to write {len(rows)} row(s) to upload_log: {e}")
+            return False
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+
+upload_log_buffer = LogBuffer()
+# Rows queued in the last interval are written on a normal interpreter shutdown
+atexit.register(upload_log_buffer.flush)
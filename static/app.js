@@ -15,10 +15,11 @@ function fmtDur(r){
   return `${m}:${String(ss).padStart(2,'0')}`;
 }
 
-async function scan(){
+// force=true makes the server re-walk the repo instead of returning its cached scan
+async function scan(force){
   let res, text, data;
   try {
-    res = await fetch('/api/scan');
+    res = await fetch(force ? '/api/scan?force=1' : '/api/scan');
     text = await res.text();
     data = JSON.parse(text);
   } catch (e) {
@@ -72,7 +73,7 @@ async function postJSON(url, body){
   return data;
 }
 
-$('#refresh').addEventListener('click', scan);
+$('#refresh').addEventListener('click', ()=> scan(true));
 $('#checkAll').addEventListener('click', ()=> $$('.sel').forEach(el=> el.checked = true));
 $('#uncheckAll').addEventListener('click', ()=> $$('.sel').forEach(el=> el.checked = false));
 
@@ -154,9 +155,7 @@ function pollMoveJob(el, id, total, label){
   const errsCountEl = el.querySelector('.job-error-count');
   const errsList= el.querySelector('.job-errors');
 
-  const t = setInterval(async ()=>{
-    const res = await fetch(`/api/jobs/${id}`);
-    const data = await res.json();
+  watchJob(id, async (data)=>{
     if (!data || !data.status) return;
 
     const moved = data.moved ?? 0;
@@ -194,9 +193,8 @@ function pollMoveJob(el, id, total, label){
     }
 
     if (data.status === 'done' || data.status === 'done_with_errors') {
-      clearInterval(t);
       barEl.style.width = '100%';
-      await scan();
+      await scan(true);
     }
   }, 1000);
 }
@@ -204,12 +202,52 @@ function pollMoveJob(el, id, total, label){
 
 
 async function pollJob(el, id){
+  watchJob(id, (data)=>{
+    el.textContent = `Job ${id}: ${data.status}` + (data.outputs ? ` -> ${data.outputs.length} outputs` : '');
+  }, 1500);
+}
+
+const jobFinished = (d) => !d || d.status === 'done' || d.status === 'done_with_errors' || d.status === 'unknown';
+
+// Every watched job shares one SSE connection (browsers allow ~6 per host over
+// HTTP/1.1, and each open stream holds a server thread). It is reopened with the
+// new id list when a job is added; the server resends current state on connect.
+const jobWatchers = new Map();
+let jobStream = null;
+
+function openJobStream(){
+  if (jobStream) jobStream.close();
+  jobStream = null;
+  if (!jobWatchers.size) return;
+  const ids = Array.from(jobWatchers.keys()).join(',');
+  const es = jobStream = new EventSource(`/api/jobs/stream?ids=${encodeURIComponent(ids)}`);
+  es.onmessage = async (ev)=>{
+    const { id, job } = JSON.parse(ev.data);
+    const onData = jobWatchers.get(id);
+    if (!onData) return;
+    if (jobFinished(job)) {
+      jobWatchers.delete(id);
+      // Close before the server ends the stream, or EventSource would reconnect
+      if (!jobWatchers.size && jobStream === es) { es.close(); jobStream = null; }
+    }
+    await onData(job);
+  };
+}
+
+// Push job updates over SSE (server only sends when a job changes);
+// fall back to polling where EventSource isn't available.
+function watchJob(id, onData, intervalMs){
+  if (window.EventSource) {
+    jobWatchers.set(String(id), onData);
+    openJobStream();
+    return;
+  }
   const t = setInterval(async ()=>{
     const res = await fetch(`/api/jobs/${id}`);
     const data = await res.json();
-    el.textContent = `Job ${id}: ${data.status}` + (data.outputs ? ` -> ${data.outputs.length} outputs` : '');
-    if (data.status === 'done') clearInterval(t);
-  }, 1500);
+    if (jobFinished(data)) clearInterval(t);
+    await onData(data);
+  }, intervalMs);
 }
 
 scan();
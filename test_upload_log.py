@@ -2,7 +2,9 @@
 """
 Diagnostic script to test upload_log functionality.
 Run this to check if the upload logging is configured correctly.
+Pass --live to also append a test row to the upload_log worksheet.
 """
+import argparse
 import os
 import json
 from datetime import datetime
@@ -27,7 +29,7 @@ def load_settings():
         'service_account_json': DEFAULT_SA_JSON,
     }
 
-def main():
+def main(live: bool = False):
     print("=" * 60)
     print("UPLOAD LOG DIAGNOSTIC")
     print("=" * 60)
@@ -75,6 +77,9 @@ def main():
             print("   Reason: sheet_name not configured")
         elif not os.path.isfile(sa_json):
             print(f"   Reason: Service account JSON file not found at {sa_json}")
+    elif not live:
+        print("\n✅ LOGGING IS ENABLED")
+        print("   Skipping live log_upload test (run with --live to write a test row)")
     else:
         print("\n✅ LOGGING IS ENABLED")
 
@@ -96,4 +101,7 @@ def main():
     print("\n" + "=" * 60)
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--live', action='store_true',
+                        help='append a test row to upload_log (uses Sheets API quota)')
+    main(live=parser.parse_args().live)